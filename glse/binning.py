@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import inspect
+import weakref
+
+import graphinglib as gl
+import numpy as np
+
+from .patches import LRUCache, patch
+
+# Histograms binned by this process which are kept, each one only holds its
+# bin counts and edges
+MAX_BINNINGS = 64
+
+# (data fingerprint, bins) -> (counts, edges)
+binnings = LRUCache(MAX_BINNINGS)
+# Data fingerprint -> (mean, standard deviation)
+moments = LRUCache(MAX_BINNINGS)
+# Fingerprints of the arrays still alive by id, arrays are not hashable
+fingerprints = {}
+
+
+def data_fingerprint(data: np.ndarray):
+    """
+    Hash of the contents of an array, remembered while the array is alive
+
+    Like GraphingLib, which bins the data once, this assumes arrays are not
+    modified in place after being binned. Returns None for object arrays.
+    """
+    if data.dtype.hasobject:
+        return None
+    if id(data) in fingerprints:
+        return fingerprints[id(data)]
+    digest = hashlib.sha1(f"{data.dtype.str} {data.shape}".encode())
+    digest.update(memoryview(np.ascontiguousarray(data)).cast("B"))
+    fingerprint = digest.hexdigest()
+    weakref.finalize(data, fingerprints.pop, id(data), None)
+    fingerprints[id(data)] = fingerprint
+    return fingerprint
+
+
+def bins_key(bins):
+    """
+    Hashable form of the bins argument of np.histogram, None if unsupported
+    """
+    if isinstance(bins, (int, np.integer, str)):
+        return bins
+    try:
+        return tuple(np.asarray(bins, dtype=float).tolist())
+    except (TypeError, ValueError):
+        return None
+
+
+def histogram(data: np.ndarray, bins):
+    """
+    Bin counts and edges of the data, like np.histogram(data, bins)
+
+    Binning the same data with the same bins again returns the stored result.
+    """
+    fingerprint = data_fingerprint(data)
+    key = (fingerprint, bins_key(bins))
+    if fingerprint is None or key[1] is None:
+        return np.histogram(data, bins)
+    if key not in binnings:
+        binnings.put(key, np.histogram(data, bins))
+    counts, edges = binnings.get(key)
+    return counts.copy(), edges.copy()
+
+
+def density(counts, edges):
+    # Same operations as np.histogram(density=True) for identical results
+    return counts / np.array(np.diff(edges), float) / counts.sum()
+
+
+def data_moments(data: np.ndarray):
+    fingerprint = data_fingerprint(data)
+    if fingerprint is None:
+        return np.mean(data), np.std(data)
+    if fingerprint not in moments:
+        moments.put(fingerprint, (np.mean(data), np.std(data)))
+    return moments.get(fingerprint)
+
+
+class BinnedAxes:
+    """
+    Axes proxy drawing histograms from the stored binnings of their data
+
+    Every other attribute is the one of the wrapped axes.
+    """
+
+    def __init__(self, axes):
+        self.axes = axes
+
+    def __getattr__(self, name):
+        return getattr(self.axes, name)
+
+    def hist(self, x, bins=None, *args, weights=None, **kwargs):
+        if args or weights is not None or bins is None or kwargs.get("range"):
+            return self.axes.hist(x, bins, *args, weights=weights, **kwargs)
+        counts, edges = histogram(np.asarray(x), bins)
+        # Each left edge falls in its own bin, weighted by the bin's count
+        return self.axes.hist(edges[:-1], edges, weights=counts, **kwargs)
+
+
+# Restyled histograms reuse the binning and moments of their data, only
+# changing the data or the bins bins it again
+@patch(gl.Histogram, "__init__")
+def binned_init(init):
+    signature = inspect.signature(init)
+
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        data = np.asarray(arguments.arguments["data"])
+        bins = arguments.arguments["number_of_bins"]
+        if data.size == 0 or data_fingerprint(data) is None or bins_key(bins) is None:
+            return init(self, *args, **kwargs)
+        # Computed on a single sample, then replaced by the stored results
+        arguments.arguments["data"] = data[:1]
+        init(*arguments.args, **arguments.kwargs)
+        self._data = data
+        self._mean, self._standard_deviation = data_moments(data)
+        counts, edges = histogram(data, bins)
+        self._bin_heights = density(counts, edges) if self._normalize else counts
+        self._bin_width = edges[1] - edges[0]
+        self._bin_centers = edges[1:] - self._bin_width / 2
+        self._bin_edges = edges
+
+    return wrapper
+
+
+@patch(gl.Histogram, "_plot_element")
+def binned_plot_element(plot_element):
+    @functools.wraps(plot_element)
+    def wrapper(self, axes, *args, **kwargs):
+        return plot_element(self, BinnedAxes(axes), *args, **kwargs)
+
+    return wrapper
+
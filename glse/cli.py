@@ -1,5 +1,74 @@
+import argparse
+import sys
+
 from .glse import run
 
 
+def sample_sheet(args):
+    from .sample_sheet import load_style, render_sample_sheet
+
+    def progress(done, total):
+        print(f"\r{done}/{total} files", end="", flush=True)
+
+    written, errors = render_sample_sheet(
+        load_style(args.style),
+        args.output_dir,
+        [format.strip() for format in args.formats.split(",")],
+        args.dpi,
+        args.workers,
+        progress,
+    )
+    print(f"\n{len(written)} files written to {args.output_dir}")
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def find_styles(args):
+    from .style_index import StyleIndex
+
+    try:
+        matches = StyleIndex().refresh().search(args.query)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    for style, section, key, value in matches:
+        print(f"{style}\t{section}.{key}\t{value}")
+    return 0
+
+
 def main():
+    parser = argparse.ArgumentParser(
+        prog="glse", description="GraphingLib Style Editor"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    sheet_parser = subparsers.add_parser(
+        "sample-sheet",
+        help="render every example figure with a style, without opening the editor",
+    )
+    sheet_parser.add_argument("style", help="style name or path to a .yml style file")
+    sheet_parser.add_argument("output_dir", help="directory of the rendered files")
+    sheet_parser.add_argument(
+        "--formats", default="png", help="comma separated formats (png, pdf, svg)"
+    )
+    sheet_parser.add_argument("--dpi", type=int, default=200)
+    sheet_parser.add_argument(
+        "--workers", type=int, default=None, help="number of worker processes"
+    )
+    find_parser = subparsers.add_parser(
+        "find-styles",
+        help="list the custom and built-in styles whose params match a query",
+    )
+    find_parser.add_argument(
+        "query",
+        help='"Section.key" or "Section.key OP value" with OP one of '
+        "=, !=, >, >=, <, <= or ~, e.g. \"Curve._line_width > 2\", rc params "
+        'are given by their name, e.g. "axes.facecolor = #1e1e1e"',
+    )
+    # Unknown arguments are left to Qt
+    args, _ = parser.parse_known_args()
+    if args.command == "sample-sheet":
+        sys.exit(sample_sheet(args))
+    if args.command == "find-styles":
+        sys.exit(find_styles(args))
     run()
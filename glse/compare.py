@@ -0,0 +1,298 @@
+import time
+
+import graphinglib as gl
+import numpy as np
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QSplitter,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .preview import FrameView, RenderPool
+from .rendering import Frame, changed_params
+
+# Name of the entry comparing the params being edited, saved or not
+CURRENT_EDITS = "(current edits)"
+# Opacity of the red drawn over the smallest pixel difference, so that
+# barely different pixels stay visible
+MIN_DIFFERENCE_ALPHA = 0.4
+
+
+def frame_pixels(frame) -> np.ndarray:
+    """
+    Height x width x RGBA view of the pixels of a frame
+    """
+    # Shared memory blocks can be larger than the frame
+    pixels = np.frombuffer(frame.data, dtype=np.uint8, count=frame.nbytes)
+    return pixels.reshape(frame.height, frame.width, 4)
+
+
+def pixel_difference(frame_a, frame_b):
+    """
+    Overlay frame of the pixels differing between two frames, and the
+    fraction of the pixels which differ
+
+    The first frame is drawn faded and the differing pixels in red, more
+    opaque the larger the difference. Frames of different sizes are compared
+    on their common top left area.
+    """
+    height = min(frame_a.height, frame_b.height)
+    width = min(frame_a.width, frame_b.width)
+    a = frame_pixels(frame_a)[:height, :width, :3].astype(np.int16)
+    b = frame_pixels(frame_b)[:height, :width, :3].astype(np.int16)
+    difference = np.abs(a - b).max(axis=2)
+    changed = difference > 0
+    faded = 255 - (255 - a.mean(axis=2)) * 0.25
+    alpha = np.where(
+        changed,
+        MIN_DIFFERENCE_ALPHA + (1 - MIN_DIFFERENCE_ALPHA) * difference / 255,
+        0.0,
+    )
+    overlay = np.empty((height, width, 4), dtype=np.uint8)
+    overlay[..., 0] = faded * (1 - alpha) + 255 * alpha
+    overlay[..., 1] = faded * (1 - alpha)
+    overlay[..., 2] = faded * (1 - alpha)
+    overlay[..., 3] = 255
+    frame = Frame(width, height, overlay, scale=frame_a.scale, copies=1)
+    return frame, float(changed.mean()) if changed.size else 0.0
+
+
+def param_differences(params_a: dict, params_b: dict):
+    """
+    Sorted [(section, key, value a, value b)] of the params which differ
+
+    The key is None when a whole section is only in one of the styles, a
+    missing value is None.
+    """
+    differences = []
+    for section, key in changed_params(params_a, params_b):
+        if key is None:
+            values = params_a.get(section), params_b.get(section)
+        else:
+            values = (
+                params_a.get(section, {}).get(key),
+                params_b.get(section, {}).get(key),
+            )
+        differences.append((section, key, *values))
+    return sorted(differences, key=lambda row: (row[0], row[1] or ""))
+
+
+def format_value(value) -> str:
+    return "(not set)" if value is None else str(value)
+
+
+class StyleCompareDialog(QDialog):
+    """
+    Same figure rendered with two styles side by side, with their param
+    differences and the pixels which differ
+
+    Both styles are rendered at the same time by the dialog's own two worker
+    processes, the editor's previews keep their workers.
+    """
+
+    def __init__(
+        self,
+        filepath,
+        chosen,
+        current_params: dict,
+        current_style: str,
+        script_cache_dir=None,
+        decimate=False,
+        parent=None,
+    ):
+        super(StyleCompareDialog, self).__init__(parent)
+        self.setWindowTitle("Compare Styles")
+        self.resize(1400, 900)
+        self.filepath = filepath
+        self.chosen = chosen
+        self.current_params = current_params
+        self.render_pool = RenderPool(max_workers=2)
+        self.render_pool.script_cache_dir = script_cache_dir
+        self.render_pool.decimate = decimate
+        self.render_pool.taskFinished.connect(self.on_frame_ready)
+        self.render_pool.taskFailed.connect(self.on_render_failed)
+        # Incremented at each render to drop the frames of outdated ones
+        self.generation = 0
+        self.frames = {}
+        self.render_start = 0.0
+        self.params = {}
+
+        styles = gl.get_styles(gl=True, customs=True, matplotlib=False)
+        names = [CURRENT_EDITS] + sorted(set(styles))
+        self.styleComboA = QComboBox(self)
+        self.styleComboA.addItems(names)
+        self.styleComboB = QComboBox(self)
+        self.styleComboB.addItems(names)
+        # The edited style against its saved version by default
+        if current_style in names:
+            self.styleComboB.setCurrentText(current_style)
+        self.styleComboA.currentTextChanged.connect(self.on_styles_changed)
+        self.styleComboB.currentTextChanged.connect(self.on_styles_changed)
+        self.differenceCheckbox = QCheckBox("Pixel difference", self)
+        self.differenceCheckbox.setChecked(True)
+        self.differenceCheckbox.toggled.connect(self.toggle_difference)
+        self.usedOnlyCheckbox = QCheckBox("Only params used by the figure", self)
+        self.usedOnlyCheckbox.toggled.connect(self.update_diff_table)
+        self.statusLabel = QLabel(self)
+
+        controlLayout = QHBoxLayout()
+        controlLayout.addWidget(QLabel("Style A:", self))
+        controlLayout.addWidget(self.styleComboA, 1)
+        controlLayout.addWidget(QLabel("Style B:", self))
+        controlLayout.addWidget(self.styleComboB, 1)
+        controlLayout.addWidget(self.differenceCheckbox)
+        controlLayout.addWidget(self.usedOnlyCheckbox)
+
+        self.viewA = FrameView()
+        self.viewB = FrameView()
+        self.differenceView = FrameView()
+        # Both styles are rendered at the size of the first view, the views
+        # share the width of the dialog
+        self.viewA.resized.connect(self.render_styles)
+        viewLayout = QHBoxLayout()
+        for view in (self.viewA, self.viewB, self.differenceView):
+            viewLayout.addWidget(view, 1)
+        viewWidget = QWidget(self)
+        viewWidget.setLayout(viewLayout)
+
+        self.diffTable = QTableWidget(0, 4, self)
+        self.diffTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.diffTable.verticalHeader().setVisible(False)
+        self.diffTable.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeToContents
+        )
+        self.diffTable.horizontalHeader().setStretchLastSection(True)
+
+        splitter = QSplitter(Qt.Vertical, self)
+        splitter.addWidget(viewWidget)
+        splitter.addWidget(self.diffTable)
+        splitter.setSizes([650, 250])
+        layout = QVBoxLayout(self)
+        layout.addLayout(controlLayout)
+        layout.addWidget(splitter, 1)
+        layout.addWidget(self.statusLabel)
+        self.setLayout(layout)
+
+        self.load_params()
+        self.update_diff_table()
+
+    def style_params(self, name) -> dict:
+        if name == CURRENT_EDITS:
+            return self.current_params
+        return gl.file_manager.FileLoader(name).load()
+
+    def load_params(self):
+        self.params = {
+            "a": self.style_params(self.styleComboA.currentText()),
+            "b": self.style_params(self.styleComboB.currentText()),
+        }
+
+    def on_styles_changed(self):
+        self.load_params()
+        self.update_diff_table()
+        self.render_styles()
+
+    def used_sections(self):
+        # Sections used under either style, None until both are rendered
+        frames = [self.frames.get(side) for side in ("a", "b")]
+        if any(frame is None or frame.sections is None for frame in frames):
+            return None
+        return frames[0].sections | frames[1].sections
+
+    def update_diff_table(self):
+        """
+        Fill the table with the params differing between the two styles, the
+        ones used by the displayed figure first and in bold
+        """
+        used = self.used_sections()
+        rows = param_differences(self.params["a"], self.params["b"])
+        if used is not None:
+            if self.usedOnlyCheckbox.isChecked():
+                rows = [row for row in rows if row[0] in used]
+            rows.sort(key=lambda row: row[0] not in used)
+        self.diffTable.setHorizontalHeaderLabels(
+            [
+                "Section",
+                "Param",
+                self.styleComboA.currentText(),
+                self.styleComboB.currentText(),
+            ]
+        )
+        # Rows are replaced together, not repainted one by one
+        self.diffTable.setUpdatesEnabled(False)
+        self.diffTable.setRowCount(len(rows))
+        bold = QFont()
+        bold.setBold(True)
+        for row, (section, key, value_a, value_b) in enumerate(rows):
+            cells = [section, key or "(whole section)", value_a, value_b]
+            for column, value in enumerate(cells):
+                item = QTableWidgetItem(format_value(value))
+                if used is not None and section in used:
+                    item.setFont(bold)
+                self.diffTable.setItem(row, column, item)
+        self.diffTable.setUpdatesEnabled(True)
+
+    def render_styles(self):
+        if not self.viewA.isVisible():
+            return
+        self.generation += 1
+        self.frames = {}
+        width, height = self.viewA.pixel_size()
+        dpi = self.viewA.dpi()
+        self.render_start = time.perf_counter()
+        for side, view in (("a", self.viewA), ("b", self.viewB)):
+            view.set_message("Rendering...")
+            self.render_pool.submit_render(
+                (side, self.generation),
+                self.filepath,
+                self.params[side],
+                width,
+                height,
+                dpi,
+                self.chosen,
+            )
+        self.statusLabel.setText("Rendering both styles...")
+
+    def on_frame_ready(self, key, frame):
+        side, generation = key
+        if generation != self.generation:
+            return
+        self.frames[side] = frame
+        (self.viewA if side == "a" else self.viewB).set_frame(frame)
+        if len(self.frames) == 2:
+            elapsed = time.perf_counter() - self.render_start
+            self.update_difference(elapsed)
+            self.update_diff_table()
+
+    def on_render_failed(self, key, message):
+        side, generation = key
+        if generation != self.generation:
+            return
+        (self.viewA if side == "a" else self.viewB).set_message(message)
+        self.differenceView.set_message("")
+        self.statusLabel.setText(f"Style {side.upper()} could not be rendered")
+
+    def update_difference(self, elapsed):
+        overlay, changed = pixel_difference(self.frames["a"], self.frames["b"])
+        self.differenceView.set_frame(overlay)
+        self.statusLabel.setText(
+            f"Both styles rendered in {elapsed:.2f} s | "
+            f"{changed:.1%} of the pixels differ"
+        )
+
+    def toggle_difference(self, checked):
+        self.differenceView.setVisible(checked)
+
+    def done(self, result):
+        self.render_pool.shutdown()
+        super(StyleCompareDialog, self).done(result)
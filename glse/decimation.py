@@ -0,0 +1,237 @@
+import contextlib
+import weakref
+
+import graphinglib as gl
+import numpy as np
+
+# Curves and scatter plots with fewer points are always drawn in full
+DECIMATION_MIN_POINTS = 10000
+# Columns in which the points of a curve are bucketed, each one keeping at
+# most four points, enough for axes this many pixels wide to look unchanged
+CURVE_BUCKETS = 2048
+# Cells per side of the grid in which a scatter plot keeps one point per cell
+SCATTER_CELLS = 1024
+
+# Indices kept for each element (by id, elements compare by value and are not
+# hashable) with the data and bucketing they were computed for, so preparing
+# the same figure again does not decimate it again
+decimations = {}
+
+
+def plotted_elements(figure):
+    """
+    (element, figure) pairs of the elements of a Figure or MultiFigure
+
+    The figure is None for the elements of twin axes, whose limits and scales
+    are not the ones of their figure.
+    """
+    if isinstance(figure, gl.MultiFigure):
+        figures = list(figure._sub_figures)
+    else:
+        figures = [figure]
+    for fig in figures:
+        for element in fig._elements:
+            yield element, fig
+        for twin in (fig._twin_x_axis, fig._twin_y_axis):
+            if twin is not None:
+                for element in twin._elements:
+                    yield element, None
+
+
+def bucket_ids(values, value_range, buckets: int, log=False):
+    """
+    Index of the bucket of each value when the range is split in equal buckets
+
+    Values outside the range are put in the buckets -1 and buckets.
+    """
+    low, high = value_range
+    if log:
+        values, low, high = np.log10(values), np.log10(low), np.log10(high)
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    scaled = np.floor((values - low) * (buckets / (high - low)))
+    return np.clip(scaled, -1, buckets).astype(np.int64)
+
+
+def first_in_segments(mask, segments):
+    """
+    Index of the first True of each segment of a mask having one
+    """
+    hits = np.flatnonzero(mask)
+    hit_segments = segments[hits]
+    first = np.ones(len(hits), dtype=bool)
+    first[1:] = hit_segments[1:] != hit_segments[:-1]
+    return hits[first]
+
+
+def curve_indices(x, y, x_range, log_x=False, buckets=CURVE_BUCKETS):
+    """
+    Points of a line to draw so it looks the same at the given resolution
+
+    Keeps the first, last, lowest and highest points of each column (M4
+    aggregation). Returns None when the x values are not sorted, since the line
+    could then go back over columns.
+    """
+    if np.any(x[1:] < x[:-1]):
+        return None
+    ids = bucket_ids(x, x_range, buckets, log_x)
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    counts = np.diff(np.append(starts, len(x)))
+    segments = np.repeat(np.arange(len(starts)), counts)
+    lowest = np.repeat(np.minimum.reduceat(y, starts), counts)
+    highest = np.repeat(np.maximum.reduceat(y, starts), counts)
+    return np.unique(
+        np.concatenate(
+            (
+                starts,
+                starts + counts - 1,
+                first_in_segments(y == lowest, segments),
+                first_in_segments(y == highest, segments),
+            )
+        )
+    )
+
+
+def scatter_indices(x, y, x_range, y_range, log_x=False, log_y=False):
+    """
+    Points of a scatter plot to draw, the last one of each grid cell
+
+    Markers drawn last are on top, so the kept point is the visible one.
+    """
+    cells = SCATTER_CELLS + 2
+    x_ids = bucket_ids(x, x_range, SCATTER_CELLS, log_x) + 1
+    y_ids = bucket_ids(y, y_range, SCATTER_CELLS, log_y) + 1
+    _, last = np.unique((x_ids * cells + y_ids)[::-1], return_index=True)
+    return len(x) - 1 - last
+
+
+def data_range(values, limits, log=False):
+    if limits:
+        return limits
+    if log:
+        values = values[values > 0]
+    if len(values) == 0:
+        return (1, 10) if log else (0, 1)
+    return values.min(), values.max()
+
+
+def color_intensities(element):
+    """
+    Arrays of intensities mapped to a colormap by a scatter plot
+    """
+    intensities = []
+    for color in (element._face_color, element._edge_color):
+        if isinstance(color, (list, tuple, np.ndarray)) and len(color) not in (3, 4):
+            intensities.append(np.asarray(color))
+    return intensities
+
+
+def preview_indices(element, figure):
+    """
+    Indices of the points of a curve or scatter plot drawn in previews
+
+    Returns None when the element is drawn in full.
+    """
+    if not isinstance(element, (gl.Curve, gl.Scatter)):
+        return None
+    x, y = np.asarray(element._x_data), np.asarray(element._y_data)
+    if len(x) < DECIMATION_MIN_POINTS or len(y) != len(x):
+        return None
+    if not (np.isfinite(x).all() and np.isfinite(y).all()):
+        # NaNs split lines, and would have to be kept where they are
+        return None
+    log_x = figure is not None and figure._log_scale_x is True
+    log_y = figure is not None and figure._log_scale_y is True
+    if (log_x and x.min() <= 0) or (log_y and y.min() <= 0):
+        return None
+    x_lim = figure._x_lim if figure is not None else None
+    y_lim = figure._y_lim if figure is not None else None
+    x_range = data_range(x, x_lim, log_x)
+    y_range = data_range(y, y_lim, log_y)
+    settings = (type(element), x_range, y_range, log_x, log_y)
+    cached = decimations.get(id(element))
+    if (
+        cached is not None
+        and cached[0] is element._x_data
+        and cached[1] is element._y_data
+        and cached[2] == settings
+    ):
+        return cached[3]
+
+    if isinstance(element, gl.Scatter):
+        indices = scatter_indices(x, y, x_range, y_range, log_x, log_y)
+        # Colormaps are normalized by the extreme intensities, keep them
+        extremes = []
+        for intensities in color_intensities(element):
+            if len(intensities) == len(x):
+                extremes += [np.argmin(intensities), np.argmax(intensities)]
+        indices = np.union1d(indices, extremes).astype(np.int64)
+    else:
+        indices = curve_indices(x, y, x_range, log_x)
+    if indices is not None and len(indices) > len(x) // 2:
+        # Not worth drawing a different figure than the exported one
+        indices = None
+    if id(element) not in decimations:
+        weakref.finalize(element, decimations.pop, id(element), None)
+    decimations[id(element)] = (element._x_data, element._y_data, settings, indices)
+    return indices
+
+
+def take(value, indices):
+    if isinstance(value, list):
+        # Lists of Python numbers are checked as such by GraphingLib
+        return [value[index] for index in indices]
+    return value[indices]
+
+
+@contextlib.contextmanager
+def decimated_data(figure):
+    """
+    Draw only the visible points of the large curves and scatter plots of a
+    Figure or MultiFigure while preparing it
+
+    The data of the elements (and their per point errors and colors) is
+    replaced inside the context and restored on exit, so it is never saved.
+    """
+    replaced = []
+    try:
+        for element, fig in plotted_elements(figure):
+            indices = preview_indices(element, fig)
+            if indices is None:
+                continue
+            count = len(element._x_data)
+            originals = {
+                name: value
+                for name, value in vars(element).items()
+                if isinstance(value, (list, np.ndarray)) and len(value) == count
+            }
+            replaced.append((element, originals))
+            # Set directly, the properties' setters convert or validate
+            for name, value in originals.items():
+                vars(element)[name] = take(value, indices)
+        yield
+    finally:
+        for element, originals in replaced:
+            vars(element).update(originals)
+
+
+def drawn_points(figure):
+    """
+    (total, drawn) points of the curves and scatter plots of a prepared figure
+
+    Returns None when none of them was decimated.
+    """
+    total = drawn = 0
+    decimated = False
+    for element, fig in plotted_elements(figure):
+        if not isinstance(element, (gl.Curve, gl.Scatter)):
+            continue
+        count = len(element._x_data)
+        indices = preview_indices(element, fig)
+        total += count
+        if indices is None:
+            drawn += count
+        else:
+            drawn += len(indices)
+            decimated = True
+    return (total, drawn) if decimated else None
@@ -0,0 +1,192 @@
+import copy
+import math
+import os
+
+import matplotlib.image as mpimg
+import numpy as np
+from PySide6.QtCore import QObject, Signal
+
+from .rendering import export_script, init_render_worker
+from .sandbox import SandboxPool
+
+EXPORT_FORMATS = ["PNG", "PDF", "SVG"]
+# Raster formats get one file per DPI, vector formats a single file
+RASTER_FORMATS = ["PNG"]
+# An export running longer than this (in seconds) has its worker killed, large
+# figures saved at a high DPI take longer than a preview
+EXPORT_TIMEOUT = 300
+
+
+def export_outputs(base_path: str, formats, dpis):
+    """
+    List the (path, format, dpi) files written by an export
+    """
+    outputs = []
+    for format in formats:
+        extension = format.lower()
+        if format in RASTER_FORMATS:
+            format_dpis = dpis
+        else:
+            # Only the images embedded in a vector file depend on the DPI
+            format_dpis = [max(dpis)]
+        for dpi in format_dpis:
+            suffix = f"_{dpi}dpi" if len(format_dpis) > 1 else ""
+            outputs.append((f"{base_path}{suffix}.{extension}", extension, dpi))
+    return outputs
+
+
+def export_base_path(filepath: str) -> str:
+    """
+    Remove the extension of a chosen file name if it is one of the export formats
+    """
+    base_path, extension = os.path.splitext(filepath)
+    if extension[1:].upper() in EXPORT_FORMATS:
+        return base_path
+    return filepath
+
+
+def compose_contact_sheet(image_paths, output_path: str, columns=None) -> str:
+    """
+    Tile PNG images on a white grid and save it as a single PNG
+    """
+    images = []
+    for path in image_paths:
+        image = mpimg.imread(path)
+        if image.shape[2] == 3:
+            image = np.dstack([image, np.ones(image.shape[:2], dtype=image.dtype)])
+        images.append(image)
+    if not images:
+        raise ValueError("no images to put on the contact sheet")
+    columns = columns or math.ceil(math.sqrt(len(images)))
+    rows = math.ceil(len(images) / columns)
+    cell_height = max(image.shape[0] for image in images)
+    cell_width = max(image.shape[1] for image in images)
+    sheet = np.ones((rows * cell_height, columns * cell_width, 4), dtype=np.float32)
+    for index, image in enumerate(images):
+        height, width = image.shape[:2]
+        # Center each image in its cell
+        top = (index // columns) * cell_height + (cell_height - height) // 2
+        left = (index % columns) * cell_width + (cell_width - width) // 2
+        sheet[top : top + height, left : left + width] = image
+    mpimg.imsave(output_path, sheet)
+    return output_path
+
+
+class ExportJob:
+    def __init__(self, job_id, outputs, contact_sheet=None):
+        self.job_id = job_id
+        # (script, chosen, path, format, dpi) of each file
+        self.outputs = outputs
+        # Path of a contact sheet composed from the PNG outputs, if any
+        self.contact_sheet = contact_sheet
+        self.tasks = []
+        self.written = []
+        self.errors = []
+
+    @property
+    def total(self):
+        return len(self.outputs) + (1 if self.contact_sheet else 0)
+
+    @property
+    def finished_outputs(self):
+        return len(self.written) + len(self.errors)
+
+    @property
+    def done(self):
+        return self.finished_outputs == self.total
+
+
+class ExportQueue(QObject):
+    """
+    Queue of figure exports run by sandboxed worker processes
+
+    Each job re-executes the figure script in a worker, so the preview figure
+    is never resized or redrawn, and every output file is saved in parallel. A
+    crashing or hanging export only fails its own file.
+    """
+
+    progress = Signal(int, int)
+    jobFinished = Signal(object)
+
+    def __init__(self, max_workers=None, timeout=EXPORT_TIMEOUT):
+        super().__init__()
+        self.pool = SandboxPool(
+            max_workers, timeout=timeout, initializer=init_render_worker
+        )
+        self.pool.taskFinished.connect(self.on_task_finished)
+        self.pool.taskFailed.connect(self.on_task_failed)
+        self.jobs = []
+        self.next_job_id = 1
+        # On-disk cache of the scripts' figures, None when disabled
+        self.script_cache_dir = None
+
+    def submit(self, filepath, params, chosen, width, height, outputs) -> ExportJob:
+        """
+        Export one figure script to the given (path, format, dpi) outputs
+        """
+        outputs = [
+            (filepath, chosen, path, format, dpi) for path, format, dpi in outputs
+        ]
+        return self.submit_job(params, width, height, outputs)
+
+    def submit_job(self, params, width, height, outputs, contact_sheet=None):
+        """
+        Export the given (script, chosen, path, format, dpi) outputs as one job
+
+        The params are copied, the queued files are sent to the workers later
+        and must not follow the edits made in the meantime.
+        """
+        params = copy.deepcopy(params)
+        job = ExportJob(self.next_job_id, outputs, contact_sheet)
+        self.next_job_id += 1
+        self.jobs.append(job)
+        for script, chosen, path, format, dpi in outputs:
+            args = (script, params, chosen, width, height, path, format, dpi)
+            args += (self.script_cache_dir,)
+            job.tasks.append(self.pool.submit((job, path), export_script, *args))
+        self.emit_progress()
+        return job
+
+    def on_task_finished(self, key, result):
+        job, path = key
+        self.on_output_done(job, path, "")
+
+    def on_task_failed(self, key, error):
+        job, path = key
+        self.on_output_done(job, path, error)
+
+    def on_output_done(self, job, path, error):
+        if error:
+            job.errors.append(f"{path}: {error}")
+        else:
+            job.written.append(path)
+        if job.contact_sheet and job.finished_outputs == len(job.outputs):
+            self.submit_contact_sheet(job)
+        self.emit_progress()
+        if job.done:
+            self.jobs.remove(job)
+            self.jobFinished.emit(job)
+            self.emit_progress()
+
+    def submit_contact_sheet(self, job):
+        # Keep the order of the outputs rather than the order they finished in
+        pngs = [
+            path
+            for _, _, path, format, _ in job.outputs
+            if format == "png" and path in job.written
+        ]
+        key = (job, job.contact_sheet)
+        job.tasks.append(
+            self.pool.submit(key, compose_contact_sheet, pngs, job.contact_sheet)
+        )
+
+    def emit_progress(self):
+        total = sum(job.total for job in self.jobs)
+        done = sum(job.finished_outputs for job in self.jobs)
+        self.progress.emit(done, total)
+
+    def shutdown(self):
+        # Running exports are stopped rather than waited for, a looping script
+        # would keep the editor from closing
+        self.pool.shutdown()
+        self.jobs = []
@@ -0,0 +1,129 @@
+import functools
+import hashlib
+import inspect
+import weakref
+
+import graphinglib.fits
+import numpy as np
+
+from .binning import data_fingerprint
+from .grid_cache import Unhashable, update_digest
+from .patches import LRUCache, patch
+
+# Fits kept by this process, each one holds the parameters, covariance and
+# evaluated curve of a fit and the residuals of its data
+MAX_FITS = 128
+FIT_CLASSES = tuple(
+    cls
+    for cls in vars(graphinglib.fits).values()
+    if isinstance(cls, type)
+    and issubclass(cls, graphinglib.fits.GeneralFit)
+    and cls is not graphinglib.fits.GeneralFit
+)
+
+# Method of each fit class building its fitted function from its parameters,
+# the function closes over the fit and is built again for each restored one
+FUNCTION_BUILDERS = {
+    cls: name
+    for cls in FIT_CLASSES
+    for name in dir(cls)
+    if name.endswith("_with_params")
+}
+# Attributes not kept in the cache, they hold the data or the fit itself
+UNCACHED_ATTRIBUTES = ("_curve_to_be_fit", "_function")
+
+# Fingerprint of the fit class, data and arguments -> attributes of the fit
+fits = LRUCache(MAX_FITS)
+# (fit fingerprint, data fingerprints) -> residuals of the fitted data
+residuals = LRUCache(MAX_FITS)
+# Fingerprint of each fit still alive by id, fits are not hashable
+fit_fingerprints = {}
+
+
+def curve_fingerprints(curve):
+    return tuple(
+        data_fingerprint(np.asarray(data)) for data in (curve._x_data, curve._y_data)
+    )
+
+
+def fit_fingerprint(cls, curve, arguments: dict):
+    """
+    Hash of the fit class, the data of the fitted curve and the other
+    arguments of the fit, None if some of them cannot be hashed
+    """
+    data = curve_fingerprints(curve)
+    if None in data:
+        return None
+    digest = hashlib.sha1(f"{cls.__module__}.{cls.__qualname__}".encode())
+    try:
+        update_digest(digest, (data, arguments), set())
+    except Unhashable:
+        return None
+    return digest.hexdigest()
+
+
+def copied_attributes(attributes: dict) -> dict:
+    # The stored arrays are never handed out, a script may modify its fit's
+    return {
+        name: value.copy() if isinstance(value, np.ndarray) else value
+        for name, value in attributes.items()
+    }
+
+
+def memoized_init(init):
+    signature = inspect.signature(init)
+
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        arguments = dict(arguments.arguments)
+        del arguments["self"]
+        curve = arguments.pop("curve_to_be_fit", None)
+        fingerprint = None
+        if isinstance(curve, (graphinglib.Curve, graphinglib.Scatter)):
+            fingerprint = fit_fingerprint(type(self), curve, arguments)
+        builder = FUNCTION_BUILDERS.get(type(self))
+        if fingerprint is None or builder is None:
+            return init(self, *args, **kwargs)
+        if fingerprint in fits:
+            self.__dict__.update(copied_attributes(fits.get(fingerprint)))
+            self._curve_to_be_fit = curve
+            self._function = getattr(self, builder)()
+        else:
+            init(self, *args, **kwargs)
+            attributes = {
+                name: value
+                for name, value in self.__dict__.items()
+                if name not in UNCACHED_ATTRIBUTES
+            }
+            fits.put(fingerprint, copied_attributes(attributes))
+        if id(self) not in fit_fingerprints:
+            weakref.finalize(self, fit_fingerprints.pop, id(self), None)
+        fit_fingerprints[id(self)] = fingerprint
+
+    return wrapper
+
+
+@patch(graphinglib.fits.GeneralFit, "get_residuals")
+def memoized_get_residuals(get_residuals):
+    @functools.wraps(get_residuals)
+    def wrapper(self):
+        fingerprint = fit_fingerprints.get(id(self))
+        data_fingerprints = curve_fingerprints(self._curve_to_be_fit)
+        if fingerprint is None or None in data_fingerprints:
+            return get_residuals(self)
+        # Keyed on the current data too, the fitted curve may have been changed
+        key = (fingerprint, data_fingerprints)
+        if key not in residuals:
+            residuals.put(key, get_residuals(self))
+        return residuals.get(key).copy()
+
+    return wrapper
+
+
+# A figure script run again after a style change neither fits its data again,
+# even for expensive FitFromFunction models, nor evaluates the fitted curve and
+# the residuals its residual curves are drawn from
+for cls in FIT_CLASSES:
+    patch(cls, "__init__")(memoized_init)
@@ -1,11 +1,19 @@
+import copy
+import multiprocessing
 import os
 import sys
+import time
 
 import graphinglib as gl
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
-from matplotlib.pyplot import close
-from PySide6.QtCore import Qt
+from PySide6.QtCore import (
+    QFileSystemWatcher,
+    QSettings,
+    QStandardPaths,
+    Qt,
+    QTimer,
+    Signal,
+)
 from PySide6.QtGui import QCloseEvent, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
@@ -19,10 +27,11 @@ from PySide6.QtWidgets import (
     QListWidget,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
-    QComboBox,
     QScrollArea,
     QSplitter,
+    QTabBar,
     QTabWidget,
     QVBoxLayout,
     QWidget,
@@ -30,22 +39,42 @@ from PySide6.QtWidgets import (
 )
 from qt_material import apply_stylesheet
 
+from .compare import StyleCompareDialog
+from .decimation import drawn_points
+from .export import EXPORT_FORMATS, ExportQueue, export_base_path, export_outputs
 from .figure_tab import create_figure_tab
 from .fits_tab import create_fits_tab
 from .other_gl_tab import create_other_gl_tab
 from .plotting_1d_tab import create_plotting_1d_tab
 from .plotting_2d_tab import create_plotting_2d_tab
+from .preview import FrameCache, FrameView, RenderPool, TileGrid
+from .rendering import (
+    ScriptFigures,
+    frame_key,
+    restyle_figure,
+    render_frame,
+    script_dependencies,
+    script_figure_names,
+    syntax_error_message,
+    use_offscreen_backend,
+    use_rc_params,
+    used_sections,
+)
+from .sample_sheet import FIGURES_DIR, CONTACT_SHEET_NAME, sample_sheet_outputs
+from .script_cache import clear_cache
 from .shapes_tab import create_shapes_tab
+from .style_index import StyleIndex
 from .widgets import IndicatorListWidget, IconLabel
 
-
-class GLCanvas(FigureCanvas):
-    def __init__(self, fig):
-        self.fig = fig
-        super(GLCanvas, self).__init__(self.fig)
+# Edits closer than this (in seconds) to the previous one are rendered as drafts
+EDIT_BURST_INTERVAL = 0.15
+# Delay without changes to a watched script after which it is rendered again
+WATCH_DEBOUNCE_MS = 300
 
 
 class FigureManager(QWidget):
+    statusMessage = Signal(str)
+
     def __init__(self, params: dict, which_figure: str = "figure"):
         super().__init__()
         self.layout = QVBoxLayout()
@@ -53,8 +82,18 @@ class FigureManager(QWidget):
         self.executing = False
         self.button = QPushButton("Load Figure from file")
         self.button.clicked.connect(self.load_python_file)
+        self.stop_button = QPushButton("Stop Script")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.stop_script)
         self.save_button = QPushButton("Save Figure as image")
         self.save_button.clicked.connect(self.save_figure)
+        self.export_queue = ExportQueue()
+        self.export_queue.progress.connect(self.on_export_progress)
+        self.export_queue.jobFinished.connect(self.on_export_finished)
+        # Shown in the status bar while exports are running
+        self.exportProgress = QProgressBar()
+        self.exportProgress.setFormat("Exporting %v/%m")
+        self.exportProgress.setVisible(False)
 
         # Create list of example figures to choose from
         self.exampleFigures = QListWidget()
@@ -74,6 +113,41 @@ class FigureManager(QWidget):
         self.autoSwitchCheckbox.setChecked(True)
         self.auto_switch_is_on = True
         self.autoSwitchCheckbox.stateChanged.connect(self.toggle_auto_switch)
+
+        # The loaded user script and its local modules are rendered again when
+        # they are saved, inotify (or the platform equivalent) is used so
+        # watching costs nothing while the files do not change
+        self.watchCheckbox = QCheckBox("Watch Script")
+        self.watchCheckbox.setChecked(True)
+        self.watchCheckbox.stateChanged.connect(self.toggle_watch)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_watched_file_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.watch_timer.timeout.connect(self.reload_watched_script)
+        # Local modules imported by the loaded user script
+        self.dependencies = []
+
+        # Add grid view checkbox to preview several figures side by side
+        self.gridViewCheckbox = QCheckBox("Grid View")
+        self.gridViewCheckbox.setChecked(False)
+        self.grid_view_is_on = False
+        self.gridViewCheckbox.stateChanged.connect(self.toggle_grid_view)
+        self.render_pool = RenderPool()
+        self.render_pool.taskFinished.connect(self.on_script_finished)
+        self.render_pool.taskFailed.connect(self.on_script_failed)
+        # On-disk cache of the scripts' figures, None when disabled
+        self.script_cache_dir = None
+        # Whether large curves and scatter plots are decimated in previews
+        self.decimate = False
+        # Sandboxed task running the loaded user script, if any
+        self.script_task = None
+        self.script_generation = 0
+        # Frame cache keys of the submitted user script renders
+        self.script_cache_keys = {}
+        self.frame_cache = FrameCache()
+        self.tile_grid = None
         self.splitter = QSplitter(Qt.Vertical)
         self.splitter.setSizes(
             [
@@ -91,7 +165,10 @@ class FigureManager(QWidget):
         self.bottom_right_layout = QVBoxLayout()
         self.bottom_right_layout.setAlignment(Qt.AlignBottom)
         self.bottom_right_layout.addWidget(self.autoSwitchCheckbox)
+        self.bottom_right_layout.addWidget(self.gridViewCheckbox)
+        self.bottom_right_layout.addWidget(self.watchCheckbox)
         self.bottom_right_layout.addWidget(self.button)
+        self.bottom_right_layout.addWidget(self.stop_button)
         self.bottom_right_layout.addWidget(self.save_button)
         self.bottom_right_widget = QWidget()
         self.bottom_right_widget.setLayout(self.bottom_right_layout)
@@ -106,7 +183,33 @@ class FigureManager(QWidget):
         self.which_figure = which_figure
         self.params = params
         self.chosen = None
-        self.canvas = None
+        # Figures are only rasterized, never shown by matplotlib
+        use_offscreen_backend()
+        # Executed script owning the live figure
+        self.script = None
+        # Live matplotlib figure matching the displayed frame, if any
+        self.figure = None
+        # Subplots of the live figure when it is a MultiFigure
+        self.multi_figure = None
+        # (script hash, params hash, chosen figure) used to prepare self.figure
+        self.figure_state = None
+        # Copy of the params self.figure was last styled with
+        self.figure_params = None
+        self.canvas = FrameView()
+        self.canvas.resized.connect(self.render_preview)
+        self.upper_layout.insertWidget(0, self.canvas)
+        # One tab per figure defined by the script, hidden for a single figure
+        self.figureTabs = QTabBar()
+        self.figureTabs.setVisible(False)
+        self.figureTabs.currentChanged.connect(self.on_figure_tab_changed)
+        self.upper_layout.insertWidget(0, self.figureTabs)
+        self.figure_names = []
+        # Names of the figures defined by each executed script, by script hash
+        self.known_figures = {}
+        # Background renders of the figures in the other tabs, by figure name
+        self.figure_tasks = {}
+        # Params sections used by the displayed figure (None means unknown)
+        self.used_sections = None
 
         # Check if figure is a path or just name
         if not self.which_figure.endswith(".py"):
@@ -128,72 +231,106 @@ class FigureManager(QWidget):
         )
         if filepath:
             self.chosen = None
+            self.set_figure_names([])
             self.which_figure = filepath
+            self.watch_script(filepath)
             # turn off auto switch
             self.autoSwitchCheckbox.setChecked(False)
             self.auto_switch_is_on = False
-            self.execute_python_file(filepath)
+            if self.grid_view_is_on:
+                self.update_grid_figures()
+            else:
+                self.execute_python_file(filepath)
 
     def save_figure(self):
-        if self.canvas and self.canvas.fig:
-            save_dialog = QDialog(self)
-            save_dialog.setWindowTitle("Save Figure Options")
-
-            layout = QVBoxLayout(save_dialog)
-
-            format_label = QLabel("Select Format:")
-            format_combo = QComboBox()
-            format_combo.addItems(["PNG", "PDF", "SVG"])
-
-            size_label = QLabel("Figure Size (Width x Height in inches):")
-
-            default_width, default_height = self.params["Figure"]["_size"]
-            width_input = QLineEdit(str(default_width))
-            height_input = QLineEdit(str(default_height))
-
-            quality_label = QLabel("Quality (DPI):")
-            quality_input = QLineEdit("200")
+        save_dialog = QDialog(self)
+        save_dialog.setWindowTitle("Save Figure Options")
+
+        layout = QVBoxLayout(save_dialog)
+
+        format_label = QLabel("Select Formats:")
+        format_checkboxes = {}
+        for format in EXPORT_FORMATS:
+            format_checkboxes[format] = QCheckBox(format)
+        format_checkboxes["PNG"].setChecked(True)
+
+        size_label = QLabel("Figure Size (Width x Height in inches):")
+
+        default_width, default_height = self.params["Figure"]["_size"]
+        width_input = QLineEdit(str(default_width))
+        height_input = QLineEdit(str(default_height))
+
+        quality_label = QLabel("Quality (DPI, comma separated for several PNGs):")
+        quality_input = QLineEdit("200")
+
+        save_button = QPushButton("Save")
+        save_button.clicked.connect(
+            lambda: self.perform_save(
+                [
+                    format
+                    for format, checkbox in format_checkboxes.items()
+                    if checkbox.isChecked()
+                ],
+                float(width_input.text()),
+                float(height_input.text()),
+                [int(dpi) for dpi in quality_input.text().split(",") if dpi.strip()],
+                save_dialog,
+            )
+        )
 
-            save_button = QPushButton("Save")
-            save_button.clicked.connect(
-                lambda: self.perform_save(
-                    format_combo.currentText(),
-                    float(width_input.text()),
-                    float(height_input.text()),
-                    int(quality_input.text()),
-                    save_dialog,
-                )
+        layout.addWidget(format_label)
+        for checkbox in format_checkboxes.values():
+            layout.addWidget(checkbox)
+        layout.addWidget(size_label)
+        layout.addWidget(width_input)
+        layout.addWidget(height_input)
+        layout.addWidget(quality_label)
+        layout.addWidget(quality_input)
+        layout.addWidget(save_button)
+
+        save_dialog.setLayout(layout)
+        save_dialog.exec()
+
+    def perform_save(self, formats, width, height, dpis, dialog):
+        if not formats or not dpis:
+            return
+        dialog.accept()
+        filters = ";;".join(
+            f"{format} Files (*.{format.lower()})" for format in formats
+        )
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Save Figure", "", f"{filters};;All Files (*)"
+        )
+        if filepath:
+            outputs = export_outputs(export_base_path(filepath), formats, dpis)
+            # The worker renders its own copy of the figure with the current params
+            self.export_queue.submit(
+                self.which_figure, self.params, self.chosen, width, height, outputs
             )
 
-            layout.addWidget(format_label)
-            layout.addWidget(format_combo)
-            layout.addWidget(size_label)
-            layout.addWidget(width_input)
-            layout.addWidget(height_input)
-            layout.addWidget(quality_label)
-            layout.addWidget(quality_input)
-            layout.addWidget(save_button)
-
-            save_dialog.setLayout(layout)
-            save_dialog.exec()
-
-    def perform_save(self, format, width, height, dpi, dialog):
-        if self.canvas and self.canvas.fig:
-            dialog.accept()
-            filepath, _ = QFileDialog.getSaveFileName(
+    def on_export_progress(self, done, total):
+        self.exportProgress.setVisible(total > 0)
+        self.exportProgress.setMaximum(total)
+        self.exportProgress.setValue(done)
+
+    def on_export_finished(self, job):
+        self.statusMessage.emit(
+            f"Export {job.job_id}: {len(job.written)} of {job.total} files saved"
+        )
+        if job.errors:
+            QMessageBox.warning(
                 self,
-                "Save Figure",
-                "",
-                f"{format} Files (*.{format.lower()});;All Files (*)",
+                "Export Failed",
+                "Some files could not be saved:\n\n" + "\n".join(job.errors),
             )
-            if filepath:
-                original_size = self.canvas.fig.get_size_inches()
-                self.canvas.fig.set_size_inches(width, height)
-                self.canvas.fig.savefig(filepath, format=format.lower(), dpi=dpi)
-                self.canvas.fig.set_size_inches(original_size)
 
     def choose_builtin_figure(self):
+        if self.grid_view_is_on:
+            self.update_grid_figures()
+            return
         self.chosen = None
+        self.set_figure_names([])
+        self.watch_script(None)
         chosen_fig = self.exampleFigures.currentItem().text()
         self.which_figure = os.path.join(
             os.path.dirname(__file__), "figures", self.example_figs_dict[chosen_fig]
@@ -204,93 +341,449 @@ class FigureManager(QWidget):
             )
         )
 
-    def execute_python_file(self, filepath):
-        # Clear the canvas widget
-        for i in reversed(range(self.upper_layout.count())):
-            widgetToRemove = self.upper_layout.itemAt(i).widget()
-            if widgetToRemove is self.canvas and self.canvas is not None:
-                self.upper_layout.removeWidget(widgetToRemove)
-                widgetToRemove.setParent(None)
-        close("all")
-
-        original_show = gl.Figure.show
-        original_save = gl.Figure.save
-        original_multi_show = gl.MultiFigure.show
-        original_multi_save = gl.MultiFigure.save
-        gl.Figure.show = self.dummy_show
-        gl.Figure.save = self.dummy_save
-        gl.MultiFigure.show = self.dummy_show
-        gl.MultiFigure.save = self.dummy_save
-
-        # Execute the script
-        namespace = {"gl": gl, "__builtins__": __builtins__}
-        with open(filepath) as file:
-            code = compile(file.read(), filepath, "exec")
-            exec(code, namespace, namespace)
-
-        gl.Figure.show = original_show
-        gl.Figure.save = original_save
-        gl.MultiFigure.show = original_multi_show
-        gl.MultiFigure.save = original_multi_save
-        # Check for figures in the namespace and display them
-        figures = {}
-        for name, var in namespace.items():
-            if isinstance(var, gl.Figure) or isinstance(var, gl.MultiFigure):
-                figures[name] = var
+    def execute_python_file(self, filepath, draft=False):
+        width, height = self.canvas.pixel_size()
+        dpi = self.canvas.dpi()
+        self.render_chosen_figure(filepath, width, height, dpi, draft)
+        # The other tabs are rendered after the visible one is submitted
+        if not draft:
+            self.render_hidden_figures(filepath, width, height, dpi)
+
+    def render_chosen_figure(self, filepath, width, height, dpi, draft=False):
+        key = self.preview_key(filepath, width, height, dpi)
+        if key[0] in self.known_figures:
+            # The chosen figure may have been renamed or removed from the script
+            self.set_figure_names(self.known_figures[key[0]])
+            key = self.preview_key(filepath, width, height, dpi)
+        frame = self.frame_cache.get(key)
+        if frame is not None:
+            # The live figure does not match the displayed frame anymore
+            self.close_figure()
+            self.used_sections = frame.sections
+            self.display_frame(frame)
+            return
 
-        # Popup to ask user which figure to display
-        if self.chosen is None:
-            if len(figures) > 1:
-                self.chosen = self.choose_figure_from_file(figures.keys())
-            else:
-                self.chosen = list(figures.keys())[0]
+        if not self.is_example(filepath):
+            # User scripts only run in sandboxed worker processes, the live
+            # figure of a previous example must not be redrawn in their place
+            self.close_figure()
+            self.run_sandboxed(filepath, key, width, height, dpi, draft)
+            return
 
-        if self.chosen is not None:
-            fig = figures[self.chosen]
-            if isinstance(fig, gl.MultiFigure):
-                fig._prepare_multi_figure()
-            elif isinstance(fig, gl.Figure):
-                fig.figure_style = "plain"
-                fig._prepare_figure(default_params=self.params)
-            self.display_figure(fig._figure)
-
-    def display_figure(self, fig):
-        self.canvas = GLCanvas(fig)
-        # add widget to layout in position 1 (after the button)
-        self.upper_layout.insertWidget(0, self.canvas)
-        # self.layout.addWidget(self.canvas)
-        # canvas.draw()
+        # The live figure is reused if it was prepared with the same params,
+        # e.g. for the full quality frame following a draft
+        if self.figure is None or self.figure_state != key[:2] + (self.chosen,):
+            if not self.update_multi_figure(key) and not self.restyle_live_figure(key):
+                if not self.load_figure(filepath):
+                    return
+                self.known_figures[key[0]] = self.figure_names
+            self.figure_state = key[:2] + (self.chosen,)
+        frame = self.render_live_figure(width, height, dpi, draft)
+        if not draft:
+            self.frame_cache.put(key, frame)
+            # Also store it under the name of the figure chosen in the script
+            self.frame_cache.put(key[:-1] + (self.chosen,), frame)
+        self.display_frame(frame)
+
+    def set_script_cache_dir(self, cache_dir):
+        self.script_cache_dir = cache_dir
+        self.render_pool.script_cache_dir = cache_dir
+        self.export_queue.script_cache_dir = cache_dir
+
+    def set_decimation(self, enabled):
+        """
+        Draw the large curves and scatter plots of the previews with only their
+        visible points, exports always use the full data
+        """
+        self.decimate = enabled
+        self.render_pool.decimate = enabled
+        # Frames drawn with the other setting must not be displayed or cached
+        self.stop_script()
+        self.script_cache_keys.clear()
+        if self.tile_grid is not None:
+            self.tile_grid.pending_keys.clear()
+        self.frame_cache.clear()
+        self.close_figure()
+        if self.grid_view_is_on:
+            self.tile_grid.update_tiles(self.params)
+        else:
+            self.render_preview()
 
-    def choose_figure_from_file(self, figures):
-        chosen, ok = QInputDialog.getItem(
-            self, "Choose Figure", "Select a figure to display", figures, 0, False
+    def is_example(self, filepath) -> bool:
+        return os.path.dirname(os.path.abspath(filepath)) == os.path.abspath(
+            FIGURES_DIR
         )
-        if ok:
-            return chosen
-        return None
 
-    def update(self, params):
+    def run_sandboxed(self, filepath, key, width, height, dpi, draft=False):
+        """
+        Render a user script in the render pool, the frame is displayed once ready
+        """
+        # A queued render is outdated, a running one is left to finish
+        if self.script_task is not None:
+            self.render_pool.cancel_queued(self.script_task)
+        task = self.figure_tasks.pop(self.chosen, None)
+        if task is not None and self.script_cache_keys.get(task.key) == key:
+            # Already submitted as a hidden tab, render it first
+            self.render_pool.prioritize(task)
+            self.script_task = task
+            self.stop_button.setEnabled(True)
+            return
+        self.script_generation += 1
+        if key[0] not in self.known_figures:
+            # The names of the figures are needed to make their tabs
+            task_key = ("script figures", self.script_generation, key[0])
+            self.script_task = self.render_pool.submit(
+                task_key, script_figure_names, filepath, self.script_cache_dir
+            )
+            self.canvas.set_message(f"Running {os.path.basename(filepath)}...")
+        else:
+            task_key = ("script frame", self.script_generation)
+            if not draft:
+                self.script_cache_keys[task_key] = key
+            self.script_task = self.render_pool.submit_render(
+                task_key, filepath, self.params, width, height, dpi, self.chosen, draft
+            )
+        self.stop_button.setEnabled(True)
+
+    def on_script_finished(self, key, result):
+        if key in self.script_cache_keys:
+            self.frame_cache.put(self.script_cache_keys.pop(key), result)
+        self.forget_figure_task(key)
+        if self.script_task is None or key != self.script_task.key:
+            return
+        self.script_task = None
+        self.stop_button.setEnabled(False)
+        if key[0] == "script frame":
+            self.used_sections = result.sections
+            self.display_frame(result)
+        elif not result:
+            self.canvas.set_message("No figure found in the script")
+        else:
+            self.known_figures[key[2]] = result
+            self.execute_python_file(self.which_figure)
+
+    def on_script_failed(self, key, message):
+        self.script_cache_keys.pop(key, None)
+        self.forget_figure_task(key)
+        if self.script_task is None or key != self.script_task.key:
+            return
+        self.script_task = None
+        self.stop_button.setEnabled(False)
+        self.canvas.set_message(f"Script failed: {message}")
+
+    def cancel_script_task(self):
+        if self.script_task is not None:
+            self.render_pool.cancel(self.script_task)
+            self.script_cache_keys.pop(self.script_task.key, None)
+            self.script_task = None
+            self.stop_button.setEnabled(False)
+
+    def stop_script(self):
+        for task in self.figure_tasks.values():
+            self.render_pool.cancel(task)
+            self.script_cache_keys.pop(task.key, None)
+        self.figure_tasks = {}
+        if self.script_task is not None:
+            self.cancel_script_task()
+            self.canvas.set_message("Script stopped")
+
+    def preview_key(self, filepath, width, height, dpi, chosen=None):
+        dependencies = self.dependencies if filepath == self.which_figure else ()
+        return frame_key(
+            filepath,
+            self.params,
+            width,
+            height,
+            dpi,
+            chosen or self.chosen,
+            dependencies,
+        )
+
+    def set_figure_names(self, names):
+        """
+        Make a tab for each figure of the script, keeping the chosen one if it
+        is still defined
+        """
+        if self.chosen not in names:
+            self.chosen = names[0] if names else None
+        self.figureTabs.blockSignals(True)
+        if names != self.figure_names:
+            self.figure_names = list(names)
+            while self.figureTabs.count():
+                self.figureTabs.removeTab(0)
+            for name in names:
+                self.figureTabs.addTab(name)
+        if self.chosen is not None:
+            self.figureTabs.setCurrentIndex(names.index(self.chosen))
+        self.figureTabs.blockSignals(False)
+        self.figureTabs.setVisible(len(names) > 1)
+
+    def on_figure_tab_changed(self, index):
+        if index < 0:
+            return
+        self.chosen = self.figure_names[index]
+        self.execute_python_file(self.which_figure)
+
+    def render_hidden_figures(self, filepath, width, height, dpi):
+        """
+        Render the figures of the other tabs in the render pool
+
+        They are queued behind the visible figure and rendered in parallel, so
+        after a style change every tab is up to date without running the
+        script again when switching to it.
+        """
+        # Queued renders are outdated, running ones are left to finish
+        for task in self.figure_tasks.values():
+            if self.render_pool.cancel_queued(task):
+                self.script_cache_keys.pop(task.key, None)
+        self.figure_tasks = {}
+        for name in self.figure_names:
+            key = self.preview_key(filepath, width, height, dpi, name)
+            if name == self.chosen or key in self.frame_cache:
+                continue
+            self.script_generation += 1
+            task_key = ("script frame", self.script_generation)
+            self.script_cache_keys[task_key] = key
+            self.figure_tasks[name] = self.render_pool.submit_render(
+                task_key, filepath, self.params, width, height, dpi, name
+            )
+
+    def forget_figure_task(self, key):
+        self.figure_tasks = {
+            name: task for name, task in self.figure_tasks.items() if task.key != key
+        }
+
+    def watch_script(self, filepath):
+        """
+        Watch a user script and its local modules, None stops watching
+        """
+        if self.watcher.files():
+            self.watcher.removePaths(self.watcher.files())
+        self.dependencies = script_dependencies(filepath) if filepath else []
+        if filepath is not None and self.watchCheckbox.isChecked():
+            paths = [filepath] + self.dependencies
+            self.watcher.addPaths([path for path in paths if os.path.isfile(path)])
+
+    def toggle_watch(self):
+        if self.is_example(self.which_figure):
+            return
+        self.watch_script(self.which_figure)
+        if self.watchCheckbox.isChecked():
+            # Catch up with the changes made while not watching
+            self.watch_timer.start()
+
+    def on_watched_file_changed(self, path):
+        # Saving often writes the file several times, wait for the last one
+        self.watch_timer.start()
+
+    def reload_watched_script(self):
+        filepath = self.which_figure
+        if self.is_example(filepath):
+            return
+        if not os.path.isfile(filepath):
+            self.canvas.set_message(f"{os.path.basename(filepath)} was removed")
+            return
+        # Files replaced on save are no longer watched and imports may have changed
+        self.watch_script(filepath)
+        # The running render is outdated
+        self.cancel_script_task()
+        error = syntax_error_message([filepath] + self.dependencies)
+        if error is not None:
+            self.canvas.set_message(error)
+            return
+        if self.grid_view_is_on:
+            self.tile_grid.update_tiles(self.params)
+        else:
+            self.execute_python_file(filepath)
+
+    def load_figure(self, filepath) -> bool:
+        """
+        Execute the script and prepare the chosen figure with the current params
+        """
+        self.close_figure()
+
+        # Execute the script and display the figures it defines
+        script = ScriptFigures(filepath, self.script_cache_dir)
+        self.set_figure_names(list(script.figures.keys()))
+
+        if self.chosen is None:
+            script.close()
+            self.canvas.set_message("No figure found in the script")
+            return False
+        # Kept until the next load so the live figure can be redrawn
+        self.script = script
+        self.used_sections = used_sections(script.figures[self.chosen], self.params)
+        self.figure = script.prepare(self.chosen, self.params, self.decimate)
+        self.figure_params = copy.deepcopy(self.params)
+        self.multi_figure = script.multi_figures.get(self.chosen)
+        return True
+
+    def close_figure(self):
+        """
+        Release the live figure, its canvas and the namespace of its script
+        """
+        if self.script is not None:
+            self.script.close()
+            self.script = None
+        self.figure = None
+        self.multi_figure = None
+        self.figure_state = None
+        self.figure_params = None
+
+    def update_multi_figure(self, key) -> bool:
+        """
+        Prepare again only the subplots of the live MultiFigure affected by the
+        params change, if the script did not change
+        """
+        if (
+            self.multi_figure is None
+            or self.figure_state is None
+            or self.figure_state[0] != key[0]
+            or self.figure_state[2] != self.chosen
+        ):
+            return False
+        if not self.multi_figure.update(self.params):
+            return False
+        self.figure_params = copy.deepcopy(self.params)
+        return True
+
+    def restyle_live_figure(self, key) -> bool:
+        """
+        Give the heatmaps, contours and stream plots of the live figure their
+        new style in place, if the script did not change and only their
+        restylable params did
+        """
+        if (
+            self.figure is None
+            or self.multi_figure is not None
+            or self.figure_state is None
+            or self.figure_state[0] != key[0]
+            or self.figure_state[2] != self.chosen
+        ):
+            return False
+        figure = self.script.figures[self.chosen]
+        if not restyle_figure(figure, self.figure_params, self.params):
+            return False
+        self.figure_params = copy.deepcopy(self.params)
+        return True
+
+    def render_live_figure(self, width, height, dpi, draft=False):
+        # The rc params were reset since the figure was prepared or restyled
+        use_rc_params(self.script.figures[self.chosen], self.figure_params)
+        if self.multi_figure is not None:
+            frame = self.multi_figure.render(width, height, dpi, draft)
+        else:
+            frame = render_frame(self.figure, width, height, dpi, draft)
+        frame.sections = self.used_sections
+        if self.decimate:
+            frame.decimation = drawn_points(self.script.figures[self.chosen])
+        return frame
+
+    def render_preview(self):
+        """
+        Display the current figure at the size of the preview, from the cache if possible
+        """
+        if self.grid_view_is_on or not self.canvas.isVisible():
+            return
+        width, height = self.canvas.pixel_size()
+        dpi = self.canvas.dpi()
+        key = self.preview_key(self.which_figure, width, height, dpi)
+        frame = self.frame_cache.get(key)
+        if frame is None:
+            if self.figure is None:
+                self.execute_python_file(self.which_figure)
+                return
+            frame = self.render_live_figure(width, height, dpi)
+            self.frame_cache.put(key, frame)
+        self.display_frame(frame)
+
+    def display_frame(self, frame):
+        self.canvas.set_frame(frame)
+        message = f"{self.frame_cache.describe()} | {self.canvas.copies} frame copies"
+        if frame.decimation is not None:
+            total, drawn = frame.decimation
+            message += (
+                f" | {drawn:,} of {total:,} points drawn ({total / drawn:.0f}x fewer)"
+            )
+        self.statusMessage.emit(message)
+
+    def update(self, params, sections=None, draft=False):
         self.params = params
+        if self.grid_view_is_on:
+            self.tile_grid.update_tiles(params, sections, draft)
+            self.statusMessage.emit(self.frame_cache.describe())
+            return
+        # Skip the render if the changed sections are not used by the figure
+        if (
+            sections is not None
+            and self.used_sections is not None
+            and not self.used_sections.intersection(sections)
+        ):
+            # The figures of the other tabs may use them
+            if not draft:
+                width, height = self.canvas.pixel_size()
+                self.render_hidden_figures(
+                    self.which_figure, width, height, self.canvas.dpi()
+                )
+            return
         # Reset plt.rcParams to mpl default
         plt.rcParams.update(plt.rcParamsDefault)
-        self.execute_python_file(self.which_figure)
+        self.execute_python_file(self.which_figure, draft)
 
     def toggle_auto_switch(self):
         self.auto_switch_is_on = self.autoSwitchCheckbox.isChecked()
 
+    def toggle_grid_view(self):
+        self.grid_view_is_on = self.gridViewCheckbox.isChecked()
+        if self.grid_view_is_on:
+            if self.tile_grid is None:
+                self.tile_grid = TileGrid(self.render_pool, self.frame_cache)
+            self.canvas.hide()
+            self.upper_layout.addWidget(self.tile_grid)
+            self.tile_grid.show()
+            # Select several examples, the tiles follow the selection
+            self.exampleFigures.blockSignals(True)
+            self.exampleFigures.setSelectionMode(QListWidget.MultiSelection)
+            for name in ["curve", "scatter", "histogram", "heatmap"]:
+                row = list(self.example_figs_dict.keys()).index(name)
+                self.exampleFigures.item(row).setSelected(True)
+            self.exampleFigures.blockSignals(False)
+            self.update_grid_figures()
+        else:
+            self.upper_layout.removeWidget(self.tile_grid)
+            self.tile_grid.hide()
+            self.exampleFigures.blockSignals(True)
+            self.exampleFigures.setSelectionMode(QListWidget.SingleSelection)
+            self.exampleFigures.clearSelection()
+            self.exampleFigures.blockSignals(False)
+            self.canvas.show()
+            self.execute_python_file(self.which_figure)
+
+    def update_grid_figures(self):
+        figures = {}
+        # Keep the figure loaded from a file along with the selected examples
+        examples_dir = os.path.join(os.path.dirname(__file__), "figures")
+        if os.path.dirname(os.path.abspath(self.which_figure)) != examples_dir:
+            figures[os.path.basename(self.which_figure)] = self.which_figure
+        for item in self.exampleFigures.selectedItems():
+            figures[item.text()] = os.path.join(
+                examples_dir, self.example_figs_dict[item.text()]
+            )
+        self.tile_grid.set_figures(figures, self.params)
+
+    def shutdown(self):
+        self.render_pool.shutdown()
+        self.export_queue.shutdown()
+
     def tab_changed_to(self, tab_name):
+        if self.grid_view_is_on:
+            return
         tab_name = tab_name.lower()
         if tab_name in self.example_figs_dict.keys():
             self.exampleFigures.setCurrentRow(
                 list(self.example_figs_dict.keys()).index(tab_name)
             )
 
-    def dummy_show(*args, **kwargs):
-        pass
-
-    def dummy_save(*args, **kwargs):
-        pass
-
 
 class StyleManager(QDialog):
     def __init__(self, parent=None):
@@ -310,9 +803,18 @@ class StyleManager(QDialog):
         self.styleList.add_items(
             gl_items=self.styles["gl"], custom_items=self.styles.get("customs", [])
         )
-        # self.styleList.setSelectionMode(QListWidget.SingleSelection)
         self.current_selection = None
-        self.styleList.list_widget.itemSelectionChanged.connect(self.update_selection)
+        self.styleList.currentTextChanged.connect(self.update_selection)
+
+        # Search of the styles by param value, answered from the style index
+        self.style_index = StyleIndex()
+        self.searchLineEdit = QLineEdit(self)
+        self.searchLineEdit.setPlaceholderText(
+            "Search params, e.g. Curve._line_width > 2 or axes.facecolor = black"
+        )
+        self.searchLineEdit.setClearButtonEnabled(True)
+        self.searchLineEdit.textChanged.connect(self.search_styles)
+        self.searchResultLabel = QLabel(self)
 
         # Explanation label
         self.explanationWidget = QWidget(self)
@@ -355,6 +857,8 @@ class StyleManager(QDialog):
         main_h_layout.addLayout(buttonLayout)
         v_layout_1 = QVBoxLayout()
         v_layout_1.addWidget(self.default_style_label)
+        v_layout_1.addWidget(self.searchLineEdit)
+        v_layout_1.addWidget(self.searchResultLabel)
         v_layout_1.addLayout(main_h_layout)
         v_layout_1.addWidget(self.explanationWidget)
         self.setLayout(v_layout_1)
@@ -362,8 +866,42 @@ class StyleManager(QDialog):
         self.shortcut_close = QShortcut(QKeySequence("Ctrl+W"), self)
         self.shortcut_close.activated.connect(self.close)
 
-    def update_selection(self):
-        self.current_selection = self.styleList.list_widget.currentItem().text()
+    def update_selection(self, text):
+        self.current_selection = text or None
+
+    def search_styles(self, text):
+        if not text.strip():
+            self.styleList.filter_items(None)
+            self.searchResultLabel.setText("")
+            return
+        try:
+            # Only the style files changed since the last search are parsed
+            results = self.style_index.refresh().search(text)
+        except ValueError as error:
+            self.searchResultLabel.setText(str(error))
+            return
+        matches = {}
+        for style, section, key, value in results:
+            matches[style] = f"{section}.{key}: {value}"
+        selection = self.current_selection
+        self.styleList.filter_items(matches)
+        if selection not in matches:
+            # Hiding the selected style must not select another one
+            self.styleList.clear_selection()
+            self.current_selection = None
+        self.searchResultLabel.setText(f"{len(matches)} matching styles")
+
+    def update_style_item(self, name):
+        # Only the row of this style changes, the rest of the list is kept
+        is_custom = name in gl.get_styles(gl=False, customs=True, matplotlib=False)
+        is_gl = name in self.styles["gl"]
+        if is_custom:
+            self.styleList.add_item(name, is_gl=False, has_gl_twin=is_gl)
+        elif is_gl:
+            self.styleList.add_item(name, is_gl=True)
+        else:
+            self.styleList.remove_item(name)
+        self.search_styles(self.searchLineEdit.text())
 
     def delete_style(self):
         if not self.current_selection:
@@ -395,13 +933,8 @@ class StyleManager(QDialog):
                         f"Default Style: {gl.get_default_style()}"
                     )
                 gl.file_manager.FileDeleter(self.current_selection).delete()
-                self.styleList.list_widget.clear()
-                self.styles = gl.get_styles(
-                    gl=True, customs=True, matplotlib=False, as_dict=True
-                )
-                self.styleList.add_items(
-                    gl_items=self.styles["gl"], custom_items=self.styles["customs"]
-                )
+                self.update_style_item(self.current_selection)
+                self.styleList.clear_selection()
                 self.current_selection = None
 
     def rename_style(self):
@@ -439,14 +972,10 @@ class StyleManager(QDialog):
             gl.file_manager.FileSaver(name, params).save()
             # delete the old style
             gl.file_manager.FileDeleter(self.current_selection).delete()
-            # update the list of styles
-            self.styleList.list_widget.clear()
-            self.styles = gl.get_styles(
-                gl=True, customs=True, matplotlib=False, as_dict=True
-            )
-            self.styleList.add_items(
-                gl_items=self.styles["gl"], custom_items=self.styles["customs"]
-            )
+            # update the rows of both names
+            self.update_style_item(self.current_selection)
+            self.update_style_item(name)
+            self.styleList.clear_selection()
             self.current_selection = None
             gl.set_default_style(name)
             self.default_style_label.setText(f"Default Style: {gl.get_default_style()}")
@@ -475,13 +1004,8 @@ class StyleManager(QDialog):
         if ok:
             params = gl.file_manager.FileLoader(self.current_selection).load()
             gl.file_manager.FileSaver(name, params).save()
-            self.styleList.list_widget.clear()
-            self.styles = gl.get_styles(
-                gl=True, customs=True, matplotlib=False, as_dict=True
-            )
-            self.styleList.add_items(
-                gl_items=self.styles["gl"], custom_items=self.styles["customs"]
-            )
+            self.update_style_item(name)
+            self.styleList.clear_selection()
             self.current_selection = None
 
     def set_default_style(self):
@@ -517,6 +1041,17 @@ class MainWindow(QMainWindow):
         self.mainWidget = QWidget(self)
         self.mainLayout = QVBoxLayout(self.mainWidget)
 
+        # Draft frames are rendered during interactions (e.g. slider drags) and
+        # bursts of edits, a full quality frame follows once they end
+        self.interacting = False
+        self.last_update_time = 0.0
+        # Sections changed since the last full quality frame (None for all)
+        self.pending_sections = set()
+        self.full_quality_timer = QTimer(self)
+        self.full_quality_timer.setSingleShot(True)
+        self.full_quality_timer.setInterval(int(EDIT_BURST_INTERVAL * 2000))
+        self.full_quality_timer.timeout.connect(self.render_full_quality)
+
         # Handled by GUI
         self.updating_from_table = False
         self.handled_by_gui = self.handled_elsewhere = [
@@ -554,12 +1089,34 @@ class MainWindow(QMainWindow):
         self.saveAction = self.fileMenu.addAction("Save")
         self.saveAsAction = self.fileMenu.addAction("Save As")
         self.managerAction = self.fileMenu.addAction("Manage styles...")
+        self.compareAction = self.fileMenu.addAction("Compare styles...")
+
+        # Add preview menu
+        self.previewMenu = self.menuBar.addMenu("Preview")
+        self.frameCacheAction = self.previewMenu.addAction("Frame cache size...")
+        self.frameCacheAction.triggered.connect(self.set_frame_cache_size)
+        self.sampleSheetAction = self.previewMenu.addAction("Render sample sheet...")
+        self.sampleSheetAction.triggered.connect(self.render_sample_sheet)
+        self.previewMenu.addSeparator()
+        self.scriptCacheAction = self.previewMenu.addAction(
+            "Cache script figures on disk"
+        )
+        self.scriptCacheAction.setCheckable(True)
+        self.scriptCacheAction.toggled.connect(self.toggle_script_cache)
+        self.clearScriptCacheAction = self.previewMenu.addAction("Clear script cache")
+        self.clearScriptCacheAction.triggered.connect(self.clear_script_cache)
+        self.decimationAction = self.previewMenu.addAction(
+            "Decimate large datasets in previews"
+        )
+        self.decimationAction.setCheckable(True)
+        self.decimationAction.toggled.connect(self.toggle_decimation)
 
         self.saveAction.triggered.connect(self.save)
         self.saveAsAction.triggered.connect(self.save_as)
         self.openAction.triggered.connect(self.load)
         self.newAction.triggered.connect(self.new)
         self.managerAction.triggered.connect(self.manage_styles)
+        self.compareAction.triggered.connect(self.compare_styles)
 
         # Connect key shortcuts to the file menu actions
         self.newAction.setShortcut("Ctrl+N")
@@ -590,6 +1147,14 @@ class MainWindow(QMainWindow):
         # Create and add the tab widget and canvas
         self.tabWidget = QTabWidget()
         self.canvas = FigureManager(self.params, which_figure="curve")
+        self.canvas.statusMessage.connect(self.statusBar().showMessage)
+        self.statusBar().addPermanentWidget(self.canvas.exportProgress)
+        self.scriptCacheAction.setChecked(
+            QSettings("GraphingLib", "glse").value("script_cache", False, type=bool)
+        )
+        self.decimationAction.setChecked(
+            QSettings("GraphingLib", "glse").value("decimation", False, type=bool)
+        )
         self.splitter.addWidget(self.tabWidget)
         self.splitter.addWidget(self.canvas)
         self.splitter.setSizes([int(width * 0.3), int(width * 0.3)])
@@ -651,9 +1216,39 @@ class MainWindow(QMainWindow):
         self.tab_widget_other_gl = create_other_gl_tab(self)
         self.tab_widget_other_gl.currentChanged.connect(self.sub_tab_changed)
 
-    def updateFigure(self):
+    def updateFigure(self, sections=None):
         # Update the figure after changing parameters
-        self.canvas.update(self.params)
+        in_burst = time.monotonic() - self.last_update_time < EDIT_BURST_INTERVAL
+        draft = self.interacting or in_burst
+        if sections is None or self.pending_sections is None:
+            self.pending_sections = None
+        else:
+            self.pending_sections.update(sections)
+        if not draft:
+            self.pending_sections = set()
+        elif not self.interacting:
+            self.full_quality_timer.start()
+        self.canvas.update(self.params, sections, draft)
+        # Measured after rendering so edits queued during a slow render count as a burst
+        self.last_update_time = time.monotonic()
+
+    def begin_interaction(self):
+        self.interacting = True
+
+    def end_interaction(self):
+        self.interacting = False
+        self.full_quality_timer.stop()
+        self.render_full_quality()
+
+    def render_full_quality(self):
+        """
+        Replace the draft frame by a full quality one
+        """
+        if self.interacting or self.pending_sections == set():
+            return
+        sections = self.pending_sections
+        self.pending_sections = set()
+        self.canvas.update(self.params, sections)
 
     def load(self):
         if self.unsaved_changes:
@@ -677,31 +1272,8 @@ class MainWindow(QMainWindow):
             self.current_style = style
 
             self.updateFigure()
-            # Identify the current tab
-            current_tab = self.tabWidget.currentIndex()
-            try:
-                current_sub_tab = (
-                    self.tabWidget.currentWidget()
-                    .layout()
-                    .itemAt(0)
-                    .widget()
-                    .currentIndex()
-                )
-            except:
-                current_sub_tab = None
-            # remove all tabs and recreate them to update the params
-            auto_switch_original = self.canvas.auto_switch_is_on
-            self.canvas.auto_switch_is_on = False
-            for i in range(self.tabWidget.count()):
-                self.tabWidget.removeTab(0)
-            self.create_tabs()
-            # set the current tab
-            self.tabWidget.setCurrentIndex(current_tab)
-            if current_sub_tab is not None:
-                self.tabWidget.currentWidget().layout().itemAt(
-                    0
-                ).widget().setCurrentIndex(current_sub_tab)
-            self.canvas.auto_switch_is_on = auto_switch_original
+            # recreate the tabs to update the params
+            self.refresh_tabs()
 
             # update the original params
             self.original_params = {}
@@ -805,13 +1377,8 @@ class MainWindow(QMainWindow):
             self.styleNameLabel.setText("Current Style: " + self.current_style)
             # update the figure
             self.updateFigure()
-            # remove all tabs and recreate them to update the params
-            auto_switch_original = self.canvas.auto_switch_is_on
-            self.canvas.auto_switch_is_on = False
-            for i in range(self.tabWidget.count()):
-                self.tabWidget.removeTab(0)
-            self.create_tabs()
-            self.canvas.auto_switch_is_on = auto_switch_original
+            # recreate the tabs to update the params
+            self.refresh_tabs()
             # update the original params
             self.original_params = {}
             for section in self.params:
@@ -843,12 +1410,8 @@ class MainWindow(QMainWindow):
         self.params = gl.file_manager.FileLoader(self.current_style).load()
         self.updateFigure()
 
-        # remove all tabs and recreate them to update the params
-        auto_switch_original = self.canvas.auto_switch_is_on
-        self.canvas.auto_switch_is_on = False
-        for i in range(self.tabWidget.count()):
-            self.tabWidget.removeTab(0)
-        self.create_tabs()
+        # recreate the tabs to update the params
+        self.refresh_tabs()
         # update the original params
         self.original_params = {}
         for section in self.params:
@@ -861,7 +1424,21 @@ class MainWindow(QMainWindow):
         # update the style name label
         self.styleNameLabel.setText("Current Style: " + self.current_style)
 
-        self.canvas.auto_switch_is_on = auto_switch_original
+    def compare_styles(self):
+        """
+        Render the current figure with two styles side by side, without
+        switching the edited style
+        """
+        compareDialog = StyleCompareDialog(
+            self.canvas.which_figure,
+            self.canvas.chosen,
+            copy.deepcopy(self.params),
+            self.current_style,
+            self.canvas.script_cache_dir,
+            self.canvas.decimate,
+            parent=self,
+        )
+        compareDialog.exec_()
 
     def update_params(self, sections: str | list, params_name: str | list, value):
         if not isinstance(params_name, list):
@@ -870,25 +1447,54 @@ class MainWindow(QMainWindow):
             sections = [sections]
         for section in sections:
             for p in params_name:
-                # Update the parameters
-                self.params[section][p] = value
-
-                # Check if the new value is different from the original
-                orig = self.original_params[section][p]
-                if orig != value:
-                    # set value in unsaved changes dict (may have to create section/params_name key)
-                    if section not in self.unsaved_changes:
-                        self.unsaved_changes[section] = {}
-                    self.unsaved_changes[section][p] = value
-                else:
-                    # remove value from unsaved changes dict
-                    if section in self.unsaved_changes:
-                        if p in self.unsaved_changes[section]:
-                            del self.unsaved_changes[section][p]
-                        if not self.unsaved_changes[section]:
-                            del self.unsaved_changes[section]
+                self.set_param(section, p, value)
 
         # Update the figure
+        self.updateFigure(sections)
+
+        # Update the style name label to indicate unsaved changes
+        if self.unsaved_changes:
+            self.styleNameLabel.setText(
+                "Current Style: " + self.current_style + " (unsaved changes)"
+            )
+        else:
+            self.styleNameLabel.setText("Current Style: " + self.current_style)
+
+    def set_param(self, section: str, param_name: str, value):
+        """
+        Set a parameter and keep track of unsaved changes without updating the figure
+        """
+        # Update the parameters
+        self.params[section][param_name] = value
+
+        # Check if the new value is different from the original
+        orig = self.original_params[section].get(param_name, None)
+        if orig != value:
+            # set value in unsaved changes dict (may have to create section/params_name key)
+            if section not in self.unsaved_changes:
+                self.unsaved_changes[section] = {}
+            self.unsaved_changes[section][param_name] = value
+        else:
+            # remove value from unsaved changes dict
+            if section in self.unsaved_changes:
+                if param_name in self.unsaved_changes[section]:
+                    del self.unsaved_changes[section][param_name]
+                if not self.unsaved_changes[section]:
+                    del self.unsaved_changes[section]
+
+    def import_rc_params(self, table: dict, handled: dict):
+        """
+        Apply a batch of imported rcParams with a single figure update
+
+        ``table`` holds the valid rows of the rcParams table and ``handled``
+        the keys which have a dedicated widget elsewhere in GLSE.
+        """
+        for key, value in handled.items():
+            self.set_param("rc_params", key, value)
+        self.update_rc_params_from_table(table, init=True)
+        if handled:
+            # recreate the tabs so the dedicated widgets show the imported values
+            self.refresh_tabs()
         self.updateFigure()
 
         # Update the style name label to indicate unsaved changes
@@ -899,6 +1505,29 @@ class MainWindow(QMainWindow):
         else:
             self.styleNameLabel.setText("Current Style: " + self.current_style)
 
+    def refresh_tabs(self):
+        """
+        Recreate all the tabs from the current params, keeping the current tab
+        """
+        current_tab = self.tabWidget.currentIndex()
+        try:
+            current_sub_tab = (
+                self.tabWidget.currentWidget().layout().itemAt(0).widget().currentIndex()
+            )
+        except:
+            current_sub_tab = None
+        auto_switch_original = self.canvas.auto_switch_is_on
+        self.canvas.auto_switch_is_on = False
+        for i in range(self.tabWidget.count()):
+            self.tabWidget.removeTab(0)
+        self.create_tabs()
+        self.tabWidget.setCurrentIndex(current_tab)
+        if current_sub_tab is not None:
+            self.tabWidget.currentWidget().layout().itemAt(0).widget().setCurrentIndex(
+                current_sub_tab
+            )
+        self.canvas.auto_switch_is_on = auto_switch_original
+
     def update_rc_params_from_table(self, table: dict, init=False):
         """
         Update the rc_params with the values in the table
@@ -965,6 +1594,66 @@ class MainWindow(QMainWindow):
 
             self.updating_from_table = False
 
+    def set_frame_cache_size(self):
+        cache = self.canvas.frame_cache
+        size, ok = QInputDialog.getInt(
+            self,
+            "Frame Cache",
+            "Memory available to cache rendered preview frames (MB):",
+            cache.max_bytes // 1024**2,
+            0,
+            64 * 1024,
+        )
+        if ok:
+            cache.set_max_bytes(size * 1024**2)
+            self.statusBar().showMessage(cache.describe())
+
+    def script_cache_dir(self):
+        return os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+            "glse",
+            "scripts",
+        )
+
+    def toggle_script_cache(self, enabled):
+        """
+        Opt in to storing the figures built by scripts so unchanged scripts
+        are not executed again, even after a relaunch
+        """
+        QSettings("GraphingLib", "glse").setValue("script_cache", enabled)
+        self.canvas.set_script_cache_dir(self.script_cache_dir() if enabled else None)
+
+    def toggle_decimation(self, enabled):
+        QSettings("GraphingLib", "glse").setValue("decimation", enabled)
+        self.canvas.set_decimation(enabled)
+
+    def clear_script_cache(self):
+        clear_cache(self.script_cache_dir())
+        self.statusBar().showMessage("Script cache cleared")
+
+    def render_sample_sheet(self):
+        """
+        Export every example figure with the current params and a contact sheet
+        """
+        choices = ["PNG", "PNG + PDF", "PNG + PDF + SVG"]
+        choice, ok = QInputDialog.getItem(
+            self, "Sample Sheet", "Formats of the example figures:", choices, 0, False
+        )
+        if not ok:
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Sample Sheet Directory")
+        if not output_dir:
+            return
+        formats = [format.strip() for format in choice.split("+")]
+        width, height = self.params["Figure"]["_size"]
+        self.canvas.export_queue.submit_job(
+            self.params,
+            width,
+            height,
+            sample_sheet_outputs(output_dir, formats, 200),
+            os.path.join(output_dir, CONTACT_SHEET_NAME),
+        )
+
     def view_unsaved_changes(self):
         msg = "Unsaved Changes:\n"
         if not self.unsaved_changes:
@@ -1061,9 +1750,14 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.No:
                 a0.ignore()
                 return
+        self.canvas.shutdown()
 
 
 def run():
+    # Spawned worker processes re-import the main script, which must not
+    # open another editor
+    if multiprocessing.parent_process() is not None:
+        return
     app = QApplication(sys.argv)
     mainWin = MainWindow()
     apply_stylesheet(
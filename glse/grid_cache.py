@@ -0,0 +1,178 @@
+import functools
+import hashlib
+import inspect
+import types
+
+import graphinglib as gl
+import numpy as np
+
+from .patches import LRUCache, patch
+
+# Memory available to the grids evaluated by from_function constructors
+MAX_GRID_BYTES = 256 * 1024**2
+# Arguments of the from_function constructors defining the evaluated grid
+GRID_ARGUMENTS = (
+    "x_axis_range",
+    "y_axis_range",
+    "number_of_points",
+    "number_of_points_x",
+    "number_of_points_y",
+    "number_of_arrows_x",
+    "number_of_arrows_y",
+)
+GRID_CLASSES = (gl.Heatmap, gl.Contour, gl.Stream, gl.VectorField)
+
+# (function fingerprint, grid arguments) -> evaluated arrays
+grids = LRUCache(
+    MAX_GRID_BYTES,
+    size=lambda stored: sum(array.nbytes for array in stored_arrays(stored)),
+)
+
+
+class Unhashable(Exception):
+    pass
+
+
+def global_names(code: types.CodeType):
+    """
+    Names a code object and the functions it defines may read as globals
+    """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= global_names(const)
+    return names
+
+
+def update_digest(digest, value, seen: set):
+    """
+    Feed what defines a value to a hash, raises Unhashable if it is unknown
+    """
+    if isinstance(value, types.FunctionType):
+        digest.update(b"function")
+        if id(value) in seen:
+            # Recursive functions refer to themselves through their globals
+            return
+        seen.add(id(value))
+        try:
+            cells = [cell.cell_contents for cell in value.__closure__ or ()]
+        except ValueError:
+            raise Unhashable("empty closure cell")
+        used_globals = {
+            name: value.__globals__[name]
+            for name in sorted(global_names(value.__code__))
+            if name in value.__globals__
+        }
+        for part in (
+            value.__code__,
+            value.__defaults__,
+            value.__kwdefaults__,
+            cells,
+            used_globals,
+        ):
+            update_digest(digest, part, seen)
+    elif isinstance(value, types.CodeType):
+        # Not its file or line numbers, moving a function does not change it
+        digest.update(value.co_code)
+        digest.update(repr(value.co_names).encode())
+        update_digest(digest, value.co_consts, seen)
+    elif isinstance(value, types.ModuleType):
+        digest.update(f"module {value.__name__}".encode())
+    elif isinstance(value, np.ufunc):
+        digest.update(f"ufunc {value.__name__}".encode())
+    elif isinstance(value, type) or (
+        # Builtin methods of objects depend on the object's state
+        isinstance(value, types.BuiltinFunctionType)
+        and isinstance(value.__self__, (types.ModuleType, type(None)))
+    ):
+        digest.update(f"{value.__module__}.{value.__qualname__}".encode())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise Unhashable("object array")
+        digest.update(f"array {value.dtype.str} {value.shape}".encode())
+        digest.update(memoryview(np.ascontiguousarray(value)).cast("B"))
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__} {len(value)}".encode())
+        for item in value:
+            update_digest(digest, item, seen)
+    elif isinstance(value, dict):
+        digest.update(f"dict {len(value)}".encode())
+        for key, item in value.items():
+            update_digest(digest, key, seen)
+            update_digest(digest, item, seen)
+    elif value is None or isinstance(
+        value, (bool, int, float, complex, str, bytes, np.generic)
+    ):
+        digest.update(repr((type(value).__name__, value)).encode())
+    else:
+        raise Unhashable(type(value).__name__)
+
+
+def function_fingerprint(func):
+    """
+    Hash of the bytecode of a function and of the values it reads, None if
+    some of them cannot be hashed
+    """
+    digest = hashlib.sha1()
+    try:
+        update_digest(digest, func, set())
+    except Unhashable:
+        return None
+    return digest.hexdigest()
+
+
+def copy_result(result):
+    if isinstance(result, np.ndarray):
+        return result.copy()
+    if isinstance(result, tuple) and all(isinstance(r, np.ndarray) for r in result):
+        return tuple(r.copy() for r in result)
+    return None
+
+
+def stored_arrays(stored):
+    return stored if isinstance(stored, tuple) else (stored,)
+
+
+def evaluate(key, func, x_grid, y_grid):
+    """
+    Values of the function on the grid, evaluated once per key
+    """
+    if key in grids:
+        return copy_result(grids.get(key))
+    result = func(x_grid, y_grid)
+    stored = copy_result(result)
+    if stored is not None:
+        grids.put(key, stored)
+    return result
+
+
+def memoized_from_function(from_function):
+    signature = inspect.signature(from_function)
+
+    @functools.wraps(from_function)
+    def wrapper(cls, func, *args, **kwargs):
+        fingerprint = function_fingerprint(func)
+        if fingerprint is None:
+            return from_function(cls, func, *args, **kwargs)
+        arguments = signature.bind(cls, func, *args, **kwargs)
+        arguments.apply_defaults()
+        grid = tuple(
+            (name, repr(arguments.arguments[name]))
+            for name in GRID_ARGUMENTS
+            if name in arguments.arguments
+        )
+        key = (fingerprint, grid)
+        return from_function(
+            cls,
+            lambda x_grid, y_grid: evaluate(key, func, x_grid, y_grid),
+            *args,
+            **kwargs,
+        )
+
+    return wrapper
+
+
+# A figure script run again after a style change reuses the grids its
+# functions were evaluated on
+for cls in GRID_CLASSES:
+    patch(cls, "from_function")(memoized_from_function)
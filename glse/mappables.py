@@ -0,0 +1,56 @@
+import functools
+import weakref
+
+import graphinglib as gl
+from matplotlib.contour import ContourSet
+from matplotlib.image import AxesImage
+
+from .patches import patch
+
+# Elements whose drawn artists can be restyled in place
+TRACKED_CLASSES = (gl.Heatmap, gl.Contour, gl.Stream)
+# Colormapped artists drawn by heatmaps and contours
+MAPPABLE_TYPES = (AxesImage, ContourSet)
+
+# Weak references to the artists last drawn by each element still alive, by id
+# since elements compare by value and are not hashable
+drawn_artists = {}
+
+
+def tracked_plot_element(plot_element):
+    @functools.wraps(plot_element)
+    def wrapper(self, axes, *args, **kwargs):
+        existing = set(axes.get_children())
+        result = plot_element(self, axes, *args, **kwargs)
+        drawn = [child for child in axes.get_children() if child not in existing]
+        if id(self) not in drawn_artists:
+            weakref.finalize(self, drawn_artists.pop, id(self), None)
+        drawn_artists[id(self)] = [weakref.ref(child) for child in drawn]
+        return result
+
+    return wrapper
+
+
+def element_artists(element, artist_type) -> list:
+    """
+    Artists of a type last drawn by an element, None if any of them is no
+    longer in its axes
+    """
+    artists = [ref() for ref in drawn_artists.get(id(element), ())]
+    if any(artist is None or artist.axes is None for artist in artists):
+        return None
+    return [artist for artist in artists if isinstance(artist, artist_type)]
+
+
+def element_mappable(element):
+    """
+    Image or contour set last drawn by a heatmap or contour, if still in its axes
+    """
+    mappables = element_artists(element, MAPPABLE_TYPES)
+    return mappables[0] if mappables else None
+
+
+# Heatmaps, contours and stream plots remember their artists, so they can be
+# restyled in place
+for cls in TRACKED_CLASSES:
+    patch(cls, "_plot_element")(tracked_plot_element)
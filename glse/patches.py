@@ -0,0 +1,121 @@
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+# Whether the patched GraphingLib attributes use their replacement in the
+# current context, they behave like the originals everywhere else
+patches_active = contextvars.ContextVar("patches_active", default=False)
+# (owner, attribute name, replacement factory) in registration order
+registered_patches = []
+install_lock = threading.Lock()
+# Number of registered patches already installed
+installed = 0
+
+
+class LRUCache:
+    """
+    Values by key, the least recently used ones dropped past a maximum size
+
+    The size of a value is 1 unless a size function is given, so max_size is
+    a number of values by default. Values larger than max_size are not kept.
+    """
+
+    def __init__(self, max_size, size=None):
+        self.max_size = max_size
+        self.size = size or (lambda value: 1)
+        self.values = OrderedDict()
+        self.total_size = 0
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key, default=None):
+        if key not in self.values:
+            return default
+        self.values.move_to_end(key)
+        return self.values[key]
+
+    def put(self, key, value):
+        size = self.size(value)
+        if key in self.values:
+            self.total_size -= self.size(self.values.pop(key))
+        if size > self.max_size:
+            return
+        self.values[key] = value
+        self.total_size += size
+        while self.total_size > self.max_size:
+            _, evicted = self.values.popitem(last=False)
+            self.total_size -= self.size(evicted)
+
+    def clear(self):
+        self.values.clear()
+        self.total_size = 0
+
+
+def patch(owner, name: str):
+    """
+    Register a replacement factory for an attribute of a GraphingLib class or
+    module, used as a decorator
+
+    The factory gets the original function and returns its replacement, which
+    is only called inside script_patches().
+    """
+
+    def register(make_replacement):
+        registered_patches.append((owner, name, make_replacement))
+        return make_replacement
+
+    return register
+
+
+def scoped(original, replacement):
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        if patches_active.get():
+            return replacement(*args, **kwargs)
+        return original(*args, **kwargs)
+
+    return wrapper
+
+
+def install_patches():
+    """
+    Wrap the registered attributes, once per process
+
+    Modules imported later can still register patches, they are installed at
+    the next call. Outside script_patches() the wrappers call the original
+    functions.
+    """
+    global installed
+    with install_lock:
+        for owner, name, make_replacement in registered_patches[installed:]:
+            attribute = inspect.getattr_static(owner, name)
+            if isinstance(attribute, classmethod):
+                original = attribute.__func__
+                replaced = classmethod(scoped(original, make_replacement(original)))
+            else:
+                replaced = scoped(attribute, make_replacement(attribute))
+            setattr(owner, name, replaced)
+        installed = len(registered_patches)
+
+
+@contextlib.contextmanager
+def script_patches():
+    """
+    Use the registered replacements while running a figure script or
+    preparing its figures in this context
+
+    The previous state is restored even if the body raises.
+    """
+    install_patches()
+    token = patches_active.set(True)
+    try:
+        yield
+    finally:
+        patches_active.reset(token)
@@ -0,0 +1,335 @@
+from collections import OrderedDict
+
+import numpy as np
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QColor, QImage, QPainter
+from PySide6.QtWidgets import QGridLayout, QLabel, QVBoxLayout, QWidget
+
+from .rendering import PREVIEW_DPI, frame_key, init_render_worker, render_script
+from .sandbox import SandboxPool
+
+# Delay without resize events after which a resize is considered done
+RESIZE_SETTLE_MS = 150
+
+
+def buffer_address(buffer) -> int:
+    return np.frombuffer(buffer, dtype=np.uint8).ctypes.data
+
+
+def frame_to_image(frame) -> QImage:
+    """
+    Wrap the pixels of a frame in a QImage without copying them
+
+    The image does not own the pixels, the frame must outlive it.
+    """
+    return QImage(
+        frame.data, frame.width, frame.height, frame.width * 4, QImage.Format_RGBA8888
+    )
+
+
+class FrameCache:
+    """
+    Least recently used cache of rendered frames bounded by their memory size
+    """
+
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        # A frame can be stored under several keys, count its memory only once
+        self.frame_refs = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        frame = self.frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.frames.move_to_end(key)
+        return frame
+
+    def __contains__(self, key):
+        # Unlike get(), not counted as a lookup
+        return key in self.frames
+
+    def put(self, key, frame):
+        if frame.nbytes > self.max_bytes:
+            return
+        if key in self.frames:
+            self.remove(key)
+        self.frames[key] = frame
+        if self.frame_refs.get(id(frame), 0) == 0:
+            self.nbytes += frame.nbytes
+        self.frame_refs[id(frame)] = self.frame_refs.get(id(frame), 0) + 1
+        self.shrink()
+
+    def remove(self, key):
+        frame = self.frames.pop(key)
+        self.frame_refs[id(frame)] -= 1
+        if self.frame_refs[id(frame)] == 0:
+            del self.frame_refs[id(frame)]
+            self.nbytes -= frame.nbytes
+
+    def shrink(self):
+        while self.nbytes > self.max_bytes and self.frames:
+            self.remove(next(iter(self.frames)))
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.shrink()
+
+    def clear(self):
+        self.frames.clear()
+        self.frame_refs.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "frames": len(self.frames),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def describe(self) -> str:
+        stats = self.stats()
+        return (
+            f"Frame cache: {stats['frames']} frames, "
+            f"{stats['bytes'] / 1024**2:.1f}/{stats['max_bytes'] / 1024**2:.0f} MB, "
+            f"{stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions"
+        )
+
+
+class FrameView(QWidget):
+    """
+    Widget displaying a rendered frame
+
+    While the widget is being resized the last frame is only scaled, the
+    resized signal is emitted once the size stops changing so a single full
+    resolution frame is rendered.
+    """
+
+    resized = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.frame = None
+        self.image = None
+        # Copies of the pixels made between rasterization and display of the frame
+        self.copies = 0
+        self.message = ""
+        self.resizing = False
+        self.setMinimumSize(100, 100)
+
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_SETTLE_MS)
+        self.resize_timer.timeout.connect(self.on_resize_settled)
+
+    def set_frame(self, frame):
+        # Replace the image first, the previous one uses the previous frame's pixels
+        self.image = frame_to_image(frame)
+        self.frame = frame
+        # Draft frames have fewer pixels but cover the same area
+        self.image.setDevicePixelRatio(self.devicePixelRatioF() * frame.scale)
+        shared = buffer_address(self.image.constBits()) == buffer_address(frame.data)
+        self.copies = frame.copies + (0 if shared else 1)
+        self.message = ""
+        self.update()
+
+    def set_message(self, message):
+        self.message = message
+        self.update()
+
+    def pixel_size(self):
+        ratio = self.devicePixelRatioF()
+        return int(self.width() * ratio), int(self.height() * ratio)
+
+    def dpi(self):
+        return PREVIEW_DPI * self.devicePixelRatioF()
+
+    def image_rect(self):
+        """
+        Rectangle in which the frame is drawn, keeping its aspect ratio if it
+        was rendered for another size
+        """
+        image_size = self.image.deviceIndependentSize().toSize()
+        if image_size == self.size():
+            return self.rect()
+        scaled = image_size.scaled(self.size(), Qt.KeepAspectRatio)
+        rect = self.rect()
+        rect.setSize(scaled)
+        rect.moveCenter(self.rect().center())
+        return rect
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(Qt.white))
+        if self.image is not None:
+            # Fast scaling is enough for the frames shown during a resize or a drag
+            painter.setRenderHint(
+                QPainter.SmoothPixmapTransform,
+                not self.resizing and not self.frame.draft,
+            )
+            painter.drawImage(self.image_rect(), self.image)
+        if self.message:
+            painter.setPen(QColor(Qt.black))
+            painter.drawText(
+                self.rect(), Qt.AlignCenter | Qt.TextWordWrap, self.message
+            )
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resizing = True
+        self.resize_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Resize events received while hidden could not be rendered
+        self.resize_timer.start()
+
+    def on_resize_settled(self):
+        self.resizing = False
+        self.resized.emit()
+        self.update()
+
+
+class RenderPool(SandboxPool):
+    """
+    Sandboxed worker processes rendering figure scripts off the GUI thread
+    """
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers, initializer=init_render_worker)
+        # On-disk cache of the scripts' figures, None when disabled
+        self.script_cache_dir = None
+        # Whether large curves and scatter plots are decimated
+        self.decimate = False
+
+    def submit_render(
+        self, key, filepath, params, width, height, dpi, chosen=None, draft=False
+    ):
+        # Frames are returned through shared memory
+        args = (filepath, params, width, height, dpi, chosen, draft, True)
+        args += (self.script_cache_dir, self.decimate)
+        return self.submit(key, render_script, *args)
+
+
+class FigureTile(QWidget):
+    def __init__(self, name, filepath):
+        super().__init__()
+        self.name = name
+        self.filepath = filepath
+        # Incremented at each submitted render to drop results of outdated ones
+        self.generation = 0
+        self.sections = None
+
+        self.title = QLabel(name)
+        self.title.setAlignment(Qt.AlignCenter)
+        self.image = FrameView()
+        self.image.set_message("Rendering...")
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(2, 2, 2, 2)
+        self.layout.addWidget(self.title)
+        self.layout.addWidget(self.image, 1)
+
+    def set_frame(self, frame):
+        self.sections = frame.sections
+        self.image.set_frame(frame)
+
+    def set_error(self, message):
+        self.image.set_message(message)
+
+
+class TileGrid(QWidget):
+    """
+    Grid of figures rendered side by side, each one by its own worker process
+    """
+
+    def __init__(self, pool: RenderPool, cache: FrameCache):
+        super().__init__()
+        self.pool = pool
+        self.cache = cache
+        # Frame cache keys of the submitted renders
+        self.pending_keys = {}
+        self.pool.taskFinished.connect(self.on_frame_ready)
+        self.pool.taskFailed.connect(self.on_render_failed)
+        self.tiles = []
+        self.params = None
+        self.layout = QGridLayout(self)
+
+    def set_figures(self, figures: dict, params):
+        """
+        Replace the tiles by the given {name: script path} figures and render them
+        """
+        for tile in self.tiles:
+            self.layout.removeWidget(tile)
+            tile.setParent(None)
+        self.tiles = [FigureTile(name, path) for name, path in figures.items()]
+        columns = max(1, round(len(self.tiles) ** 0.5))
+        for index, tile in enumerate(self.tiles):
+            self.layout.addWidget(tile, index // columns, index % columns)
+            # Tiles are rendered once shown and after each resize
+            tile.image.resized.connect(lambda tile=tile: self.render_tile(tile))
+        self.params = params
+
+    def update_tiles(self, params, sections=None, draft=False):
+        self.params = params
+        for tile in self.tiles:
+            if (
+                sections is None
+                or tile.sections is None
+                or tile.sections.intersection(sections)
+            ):
+                self.render_tile(tile, draft)
+
+    def render_tile(self, tile, draft=False):
+        tile.generation += 1
+        ratio = tile.devicePixelRatioF()
+        width = int(max(tile.image.width(), 100) * ratio)
+        height = int(max(tile.image.height(), 100) * ratio)
+        dpi = PREVIEW_DPI * ratio
+        cache_key = frame_key(tile.filepath, self.params, width, height, dpi)
+        frame = self.cache.get(cache_key)
+        if frame is not None:
+            tile.set_frame(frame)
+            return
+        # The pool is shared with the preview, whose keys start with their kind
+        key = ("tile", id(tile), tile.generation)
+        if not draft:
+            self.pending_keys[key] = cache_key
+        self.pool.submit_render(
+            key, tile.filepath, self.params, width, height, dpi, draft=draft
+        )
+
+    def find_tile(self, key):
+        if key[0] != "tile":
+            return None
+        _, tile_id, generation = key
+        for tile in self.tiles:
+            if id(tile) == tile_id and tile.generation == generation:
+                return tile
+        return None
+
+    def on_frame_ready(self, key, frame):
+        if key in self.pending_keys:
+            self.cache.put(self.pending_keys.pop(key), frame)
+        tile = self.find_tile(key)
+        if tile is not None:
+            tile.set_frame(frame)
+
+    def on_render_failed(self, key, message):
+        self.pending_keys.pop(key, None)
+        tile = self.find_tile(key)
+        if tile is not None:
+            tile.set_error(message)
@@ -0,0 +1,113 @@
+from enum import Enum
+
+import matplotlib as mpl
+from matplotlib.colors import is_color_like
+
+# Values accepted by the dropdowns of the Figure tab
+HANDLED_ELSEWHERE_CHOICES = {
+    "xtick.direction": ["in", "out", "inout"],
+    "ytick.direction": ["in", "out", "inout"],
+    "grid.linestyle": ["-", "--", ":", "-."],
+    "font.family": ["sans-serif", "serif", "monospace"],
+}
+LINESTYLE_NAMES = {"solid": "-", "dashed": "--", "dotted": ":", "dashdot": "-."}
+NUMERIC_KEYS = ["axes.linewidth", "font.size", "grid.linewidth", "grid.alpha"]
+COLOR_KEYS = [
+    "figure.facecolor",
+    "axes.facecolor",
+    "axes.edgecolor",
+    "axes.labelcolor",
+    "xtick.color",
+    "ytick.color",
+    "legend.facecolor",
+    "legend.edgecolor",
+    "grid.color",
+]
+
+
+def strip_rc_comment(line: str) -> str:
+    """
+    Remove everything after the first unquoted "#" of a line
+    """
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "#" and not in_quotes:
+            return line[:index].strip()
+    return line.strip()
+
+
+def parse_rc_text(text: str):
+    """
+    Parse the contents of a matplotlibrc or .mplstyle file
+
+    Returns a dict of the key/value strings in file order and a list of the
+    lines which could not be parsed.
+    """
+    rc_params = {}
+    bad_lines = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        stripped = strip_rc_comment(line)
+        if not stripped:
+            continue
+        key, sep, value = stripped.partition(":")
+        key, value = key.strip(), value.strip()
+        if not sep or not key:
+            bad_lines.append(f"line {line_number}: {line.strip()}")
+            continue
+        if len(value) > 1 and value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        rc_params[key] = value
+    return rc_params, bad_lines
+
+
+def read_rc_file(filepath: str):
+    with open(filepath, encoding="utf-8") as file:
+        return parse_rc_text(file.read())
+
+
+def validate_rc_value(key: str, value):
+    """
+    Return the value converted by matplotlib's validator for this key
+
+    Raises KeyError for unknown keys and ValueError for invalid values. The
+    global rcParams are left untouched.
+    """
+    return mpl.rcParams.validate[key](value)
+
+
+def to_editor_value(key: str, value):
+    """
+    Convert a validated rcParam into the form used by the dedicated GLSE widget
+
+    Raises ValueError if the widget cannot represent the value.
+    """
+    # Cap and join styles are validated to enums, which a style file can
+    # only hold as their name
+    if isinstance(value, Enum):
+        value = value.name
+    if key == "axes.prop_cycle":
+        if set(value.keys) != {"color"}:
+            raise ValueError("only color cycles can be edited in GLSE")
+        return f"cycler('color', {value.by_key()['color']!r})"
+    if key == "font.family":
+        if len(value) != 1:
+            raise ValueError("only a single font family can be edited in GLSE")
+        value = value[0]
+    if key == "grid.linestyle":
+        value = LINESTYLE_NAMES.get(value, value)
+    if key in HANDLED_ELSEWHERE_CHOICES:
+        if value not in HANDLED_ELSEWHERE_CHOICES[key]:
+            raise ValueError(f"{value!r} is not available in GLSE for {key}")
+        return value
+    if key in NUMERIC_KEYS:
+        value = float(value)
+        return int(value) if value == int(value) else value
+    if key in COLOR_KEYS:
+        if not isinstance(value, str) or not (
+            is_color_like(value) or (key == "legend.edgecolor" and value == "none")
+        ):
+            raise ValueError(f"{value!r} is not a color")
+        return value
+    return value
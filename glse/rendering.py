@@ -0,0 +1,1037 @@
+import ast
+import contextlib
+import contextvars
+import copy
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+from string import ascii_lowercase
+
+import graphinglib as gl
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.transforms import Bbox, ScaledTranslation
+
+# Imported for the GraphingLib patches they register
+from . import binning, fit_cache, grid_cache
+from .decimation import decimated_data, drawn_points, plotted_elements
+from .mappables import element_mappable
+from .patches import patch, script_patches
+from .script_cache import load_cached_figures, store_cached_figures, track_opened_files
+from .streamlines import STREAM_STYLE_PARAMS, stream_restyle
+
+# Resolution of the preview figures at a device pixel ratio of 1
+PREVIEW_DPI = 100
+
+# Draft frames are rendered at a fraction of the resolution, without
+# antialiasing and with aggressive path simplification
+DRAFT_SCALE = 0.5
+DRAFT_RC_PARAMS = {"path.simplify": True, "path.simplify_threshold": 1.0}
+# (width, height, dpi) each matplotlib figure was last laid out at
+laid_out_sizes = weakref.WeakKeyDictionary()
+
+# Params sections styling a whole MultiFigure rather than some of its subplots
+MULTI_FIGURE_SECTIONS = {"MultiFigure", "rc_params"}
+
+# Params only changing the colormap of the image or contour set of an element
+COLORMAP_PARAMS = {("Heatmap", "_color_map"), ("Contour", "_color_map")}
+# Params changed on the artists of a prepared figure, without preparing it again
+RESTYLED_PARAMS = COLORMAP_PARAMS | {("Stream", key) for key in STREAM_STYLE_PARAMS}
+
+
+class Frame:
+    """
+    Rendered RGBA image of a figure
+
+    The pixels are a buffer (usually the Agg renderer's own buffer) which is
+    kept alive by the frame. Frames rendered in another process are sent
+    through a shared memory block instead of being pickled.
+    """
+
+    def __init__(
+        self, width: int, height: int, data, sections=None, scale=1.0, copies=0
+    ):
+        self.width = width
+        self.height = height
+        self.data = data
+        # Params sections used by the rendered figure
+        self.sections = sections
+        # Resolution relative to the requested one, lower than 1 for drafts
+        self.scale = scale
+        # Number of times the pixels were copied since they were rasterized
+        self.copies = copies
+        # (total, drawn) points of the curves and scatter plots when some of
+        # them were decimated, None otherwise
+        self.decimation = None
+        # Shared memory block holding the pixels, if any
+        self.shm = None
+
+    def to_shared_memory(self):
+        """
+        Move the pixels to a new shared memory block
+        """
+        shm = SharedMemory(create=True, size=self.nbytes)
+        try:
+            shm.buf[: self.nbytes] = memoryview(self.data).cast("B")
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        # The block's own view (it can be a page larger) is the only export, so
+        # the block can always be closed when it is garbage collected
+        self.data = shm.buf
+        self.shm = shm
+        self.copies += 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.shm is not None:
+            # Only the name of the block is sent, the receiver maps it
+            state["data"] = None
+            state["shm"] = self.shm.name
+        elif not isinstance(self.data, bytes):
+            state["data"] = bytes(self.data)
+            state["copies"] += 1
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.shm is not None:
+            self.shm = SharedMemory(name=self.shm)
+            # The mapping stays valid once unlinked and is freed with the frame
+            self.shm.unlink()
+            self.data = self.shm.buf
+
+    @property
+    def draft(self):
+        return self.scale < 1
+
+    @property
+    def nbytes(self):
+        return self.width * self.height * 4
+
+
+def file_hash(filepath: str) -> str:
+    with open(filepath, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def changed_sections(old_params: dict, new_params: dict) -> set:
+    return {
+        section
+        for section in old_params.keys() | new_params.keys()
+        if old_params.get(section) != new_params.get(section)
+    }
+
+
+def changed_params(old_params: dict, new_params: dict) -> set:
+    """
+    (section, key) pairs of the params which differ, the key is None when a
+    whole section is added or removed
+    """
+    changed = set()
+    for section in changed_sections(old_params, new_params):
+        old, new = old_params.get(section), new_params.get(section)
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            changed.add((section, None))
+            continue
+        changed.update(
+            (section, key)
+            for key in old.keys() | new.keys()
+            if old.get(key) != new.get(key)
+        )
+    return changed
+
+
+def params_hash(params: dict) -> str:
+    """
+    Hash of the params which does not depend on the order of the sections and keys
+    """
+    canonical = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def script_hash(filepath, dependencies=()) -> str:
+    """
+    Hash of a script and of the local modules it imports
+    """
+    digest = file_hash(filepath)
+    if dependencies:
+        hashes = [digest] + [
+            file_hash(path) for path in dependencies if os.path.isfile(path)
+        ]
+        digest = hashlib.sha1("".join(hashes).encode()).hexdigest()
+    return digest
+
+
+def frame_key(filepath, params, width, height, dpi, chosen=None, dependencies=()):
+    """
+    Key identifying a rendered frame in a frame cache
+
+    dependencies are the local modules imported by the script, their contents
+    are part of the key like the script's.
+    """
+    return (
+        script_hash(filepath, dependencies),
+        params_hash(params),
+        (int(width), int(height)),
+        float(dpi),
+        chosen,
+    )
+
+
+# show() and save() calls made while this holds a list are recorded in it
+# instead of being performed. Being a context variable, capturing in a thread
+# or an asyncio task never affects the others.
+captured_calls = contextvars.ContextVar("captured_calls", default=None)
+capture_lock = threading.Lock()
+capture_installed = False
+# Params loaded by GraphingLib in place of any style file, see loaded_params()
+style_params = contextvars.ContextVar("style_params", default=None)
+
+
+def capturing_method(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        calls = captured_calls.get()
+        if calls is None:
+            return method(self, *args, **kwargs)
+        calls.append((method.__name__, self))
+
+    return wrapper
+
+
+def install_capture():
+    """
+    Wrap the show and save methods of GraphingLib figures, once per process
+
+    Outside capture_calls() the wrappers call the original methods.
+    """
+    global capture_installed
+    with capture_lock:
+        if capture_installed:
+            return
+        for cls in (gl.Figure, gl.MultiFigure):
+            for name in ("show", "save"):
+                setattr(cls, name, capturing_method(getattr(cls, name)))
+        capture_installed = True
+
+
+@contextlib.contextmanager
+def capture_calls():
+    """
+    Record the show() and save() calls of GraphingLib figures in this context
+
+    Nested captures each get their own list, and the previous one is restored
+    even if the body raises.
+    """
+    install_capture()
+    calls = []
+    token = captured_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        captured_calls.reset(token)
+
+
+@patch(gl.file_manager.FileLoader, "load")
+def params_loader(load):
+    @functools.wraps(load)
+    def wrapper(self):
+        params = style_params.get()
+        if params is None:
+            return load(self)
+        # GraphingLib fills in the params it loads
+        return copy.deepcopy(params)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def loaded_params(params: dict):
+    """
+    Make GraphingLib load the given params instead of any style file in this
+    context, inside script_patches()
+    """
+    token = style_params.set(params)
+    try:
+        yield
+    finally:
+        style_params.reset(token)
+
+
+def execute_figure_script(filepath: str) -> dict:
+    """
+    Execute a Python script and return its namespace
+    """
+    namespace = {"gl": gl, "__builtins__": __builtins__}
+    with open(filepath) as file:
+        code = compile(file.read(), filepath, "exec")
+    # Modules next to the script can be imported, like when running it directly
+    script_dir = os.path.dirname(os.path.abspath(filepath))
+    modules = set(sys.modules)
+    sys.path.insert(0, script_dir)
+    try:
+        # Scripts usually end by showing or saving their figure, which must not
+        # open a window or write files while previewing. Running the script
+        # again after a style change reuses the binning of its histograms, the
+        # grids evaluated by its from_function calls and its fit results.
+        with capture_calls(), script_patches():
+            exec(code, namespace, namespace)
+    finally:
+        sys.path.remove(script_dir)
+        # Local modules may be edited before the next run, import them again
+        # then. Only those, packages installed next to the script (e.g. in a
+        # virtualenv) stay imported in persistent workers.
+        local_modules = set(script_dependencies(filepath))
+        for name in set(sys.modules) - modules:
+            module_file = getattr(sys.modules[name], "__file__", None)
+            if module_file and os.path.abspath(module_file) in local_modules:
+                del sys.modules[name]
+    return namespace
+
+
+def local_module_path(name: str, directory: str):
+    path = os.path.join(directory, *name.split("."))
+    for candidate in (path + ".py", os.path.join(path, "__init__.py")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def syntax_error_message(paths):
+    """
+    Description of the first syntax error found in the given Python files
+    """
+    for path in paths:
+        try:
+            with open(path) as file:
+                compile(file.read(), path, "exec")
+        except SyntaxError as error:
+            return (
+                f"{type(error).__name__} in {os.path.basename(path)}, "
+                f"line {error.lineno}: {error.msg}"
+            )
+        except (OSError, ValueError) as error:
+            return f"{os.path.basename(path)}: {error}"
+    return None
+
+
+def script_dependencies(filepath: str) -> list:
+    """
+    Local modules imported by a script, directly or through each other
+
+    Modules are searched next to the script. Files which cannot be parsed are
+    still listed but not followed.
+    """
+    script_dir = os.path.dirname(os.path.abspath(filepath))
+    dependencies = []
+    to_parse = [os.path.abspath(filepath)]
+    while to_parse:
+        path = to_parse.pop()
+        try:
+            with open(path) as file:
+                tree = ast.parse(file.read(), path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                names = [node.module] + [
+                    f"{node.module}.{alias.name}" for alias in node.names
+                ]
+            else:
+                continue
+            for name in names:
+                module_path = local_module_path(name, script_dir)
+                if module_path is not None and module_path not in dependencies:
+                    dependencies.append(module_path)
+                    to_parse.append(module_path)
+    return dependencies
+
+
+class ScriptFigures:
+    """
+    GraphingLib figures defined by an executed figure script
+
+    Owns the script's namespace and the matplotlib figures prepared from it
+    until close() releases them. Can be used as a context manager.
+
+    With a cache_dir, the figures are loaded from the on-disk cache when
+    neither the script nor the files it read changed, without running it.
+    """
+
+    def __init__(self, filepath: str, cache_dir=None):
+        self.filepath = filepath
+        self.mpl_figures = []
+        # Prepared MultiFigures by name, their subplots can be updated one by one
+        self.multi_figures = {}
+        self.figures = None
+        if cache_dir is not None:
+            self.figures = load_cached_figures(filepath, cache_dir)
+        if self.figures is not None:
+            self.namespace = {}
+            return
+
+        with track_opened_files() as opened_files:
+            self.namespace = execute_figure_script(filepath)
+        self.figures = {}
+        for name, var in self.namespace.items():
+            if isinstance(var, gl.Figure) or isinstance(var, gl.MultiFigure):
+                self.figures[name] = var
+        if cache_dir is not None:
+            # Stored before preparing, while the figures hold no matplotlib objects
+            store_cached_figures(filepath, cache_dir, self.figures, opened_files)
+
+    def choose(self, chosen=None):
+        """
+        Name of the chosen figure, or of the first one if it is not defined
+        """
+        if chosen not in self.figures:
+            chosen = list(self.figures.keys())[0]
+        return chosen
+
+    def prepare(self, name, params: dict, decimate=False):
+        figure = self.figures[name]
+        if isinstance(figure, gl.MultiFigure):
+            self.multi_figures[name] = MultiFigurePreview(figure, params, decimate)
+            mpl_figure = self.multi_figures[name].mpl_figure
+        else:
+            mpl_figure = prepare_figure(figure, params, decimate)
+        self.mpl_figures.append(mpl_figure)
+        return mpl_figure
+
+    def close(self):
+        # MultiFigures prepared again as a whole have a new figure
+        for preview in self.multi_figures.values():
+            if preview.mpl_figure not in self.mpl_figures:
+                self.mpl_figures.append(preview.mpl_figure)
+        for mpl_figure in self.mpl_figures:
+            plt.close(mpl_figure)
+            # Drop the axes and artists even if something still holds the figure
+            mpl_figure.clear()
+        self.mpl_figures.clear()
+        self.multi_figures.clear()
+        self.figures.clear()
+        # Functions defined by the script reference its namespace as globals,
+        # clearing it breaks these reference cycles
+        self.namespace.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def prepare_figure(figure, params: dict, decimate=False):
+    """
+    Prepare a GraphingLib figure with the given params and return the matplotlib figure
+
+    With decimate=True, large curves and scatter plots are drawn with only the
+    points visible in a preview.
+    """
+    if isinstance(figure, gl.MultiFigure):
+        return MultiFigurePreview(figure, params, decimate).mpl_figure
+    elif isinstance(figure, gl.Figure):
+        figure.figure_style = "plain"
+        # Histograms are drawn from their stored binning, heatmaps, contours
+        # and stream plots remember their artists
+        with decimated_data(figure) if decimate else contextlib.nullcontext():
+            with script_patches():
+                figure._prepare_figure(default_params=params)
+    return figure._figure
+
+
+def restyle_figure(figure, old_params: dict, new_params: dict) -> bool:
+    """
+    Give the heatmaps, contours and stream plots of a prepared Figure the
+    style of the new params, in place
+
+    Heatmaps and contours keep their data and only map it through the new
+    colormap's lookup table when drawn, colorbars follow. Stream plots keep
+    their integrated streamlines, only their lines and arrows are restyled.
+    Returns False if other params changed or an artist is missing, the figure
+    must then be prepared again.
+    """
+    changed = changed_params(old_params, new_params)
+    if not isinstance(figure, gl.Figure) or not changed <= RESTYLED_PARAMS:
+        return False
+    restyles = []
+    for element, _ in plotted_elements(figure):
+        section = element_section(element, new_params)
+        # Styles given by the script are not styled by the params
+        keys = [
+            key
+            for changed_section, key in changed
+            if changed_section == section
+            and isinstance(getattr(element, key, None), str)
+            and getattr(element, key) == "default"
+        ]
+        if not keys:
+            continue
+        if isinstance(element, gl.Stream):
+            restyle = stream_restyle(
+                element, {key: new_params[section][key] for key in keys}
+            )
+            if restyle is None:
+                return False
+            restyles.append(restyle)
+            continue
+        color_map = new_params[section]["_color_map"]
+        mappable = element_mappable(element)
+        if mappable is None or color_map == "default":
+            return False
+        restyles.append(functools.partial(mappable.set_cmap, color_map))
+    for restyle in restyles:
+        restyle()
+    return True
+
+
+def use_rc_params(figure, params: dict):
+    """
+    Set the rc params GraphingLib prepared a Figure or MultiFigure with
+
+    The ticks of a figure are made when it is drawn, with the rc params in
+    effect then.
+    """
+    figure._default_params = params
+    figure._fill_in_rc_params()
+    figure._rc_dict = {}
+
+
+class Subplot:
+    def __init__(self, index, sub_figure):
+        self.index = index
+        self.sub_figure = sub_figure
+        # Main axes first, followed by the twin and colorbar axes
+        self.axes = []
+        # Params sections used by the subfigure (None means unknown)
+        self.sections = None
+        # Position of each axes in the last full quality frame, and pixel
+        # extent of the axes and their decorations there, measured when they
+        # change
+        self.positions = None
+        self.extent = None
+        # (element, label) of the elements before they were first prepared
+        self.labels = [
+            (element, element._label)
+            for element, _ in plotted_elements(sub_figure)
+            if hasattr(element, "_label")
+        ]
+
+    def restore_labels(self):
+        # Histograms append their statistics to their label when prepared
+        for element, label in self.labels:
+            element._label = label
+
+    def is_main_axes(self, axes) -> bool:
+        spec = axes.get_subplotspec()
+        sub_figure = self.sub_figure
+        return spec is not None and (spec.rowspan, spec.colspan) == (
+            range(sub_figure._row_start, sub_figure._row_start + sub_figure._row_span),
+            range(sub_figure._col_start, sub_figure._col_start + sub_figure._col_span),
+        )
+
+
+class MultiFigurePreview:
+    """
+    Matplotlib figure of a MultiFigure whose subplots can be prepared again
+    separately
+
+    Prepared by MultiFigure._prepare_multi_figure, with the given params
+    instead of a style file. After a change to the params, only the subplots
+    using the changed sections are prepared again, and when the layout of the
+    others did not move only their part of the last frame is redrawn.
+    """
+
+    def __init__(self, multi_figure, params: dict, decimate=False):
+        self.multi_figure = multi_figure
+        self.decimate = decimate
+        self.subplots = [
+            Subplot(index, sub_figure)
+            for index, sub_figure in enumerate(multi_figure._sub_figures)
+        ]
+        # Last full quality frame, the size and DPI it was requested with, and
+        # the subplots changed since then
+        self.frame = None
+        self.size = None
+        self.dpi = None
+        self.dirty = set()
+        self.mpl_figure = None
+        # Whether subplots were prepared again since the whole figure was
+        self.reprepared = False
+        self.prepare(params)
+
+    def prepare(self, params: dict):
+        multi_figure = self.multi_figure
+        # Copied since the editor changes its params in place
+        self.params = copy.deepcopy(params)
+        multi_figure._figure_style = "plain"
+        if self.mpl_figure is not None:
+            plt.close(self.mpl_figure)
+        for subplot in self.subplots:
+            subplot.restore_labels()
+        decimate = self.decimate
+        with decimated_data(multi_figure) if decimate else contextlib.nullcontext():
+            with script_patches(), loaded_params(self.params):
+                multi_figure._prepare_multi_figure()
+        self.mpl_figure = multi_figure._figure
+        # Each subfigure adds its main axes, then its twin and colorbar axes
+        starts = []
+        for subplot in self.subplots:
+            first = starts[-1] + 1 if starts else 0
+            starts.append(
+                next(
+                    index
+                    for index, axes in enumerate(self.mpl_figure.axes)
+                    if index >= first and subplot.is_main_axes(axes)
+                )
+            )
+        for subplot, start, end in zip(self.subplots, starts, starts[1:] + [None]):
+            subplot.axes = self.mpl_figure.axes[start:end]
+            subplot.sections = used_sections(subplot.sub_figure, self.params)
+        self.grid = self.subplots[0].axes[0].get_subplotspec().get_gridspec()
+        self.frame = None
+        self.dirty = set(self.subplots)
+        self.reprepared = False
+
+    def prepare_subplot(self, subplot: Subplot):
+        """
+        Replace the axes of a subplot by newly prepared ones
+        """
+        multi_figure = self.multi_figure
+        for axes in subplot.axes:
+            axes.remove()
+        subplot.restore_labels()
+        # Filled in from the params like by MultiFigure._prepare_multi_figure
+        params_to_reset = multi_figure._fill_in_missing_params(multi_figure)
+        # Axes are styled by the rc params in effect when they are created
+        multi_figure._fill_in_rc_params()
+        if multi_figure._reflabel_loc == "outside":
+            offset = (-5 / 72, 10 / 72)
+        else:
+            offset = (10 / 72, -15 / 72)
+        translation = ScaledTranslation(*offset, self.mpl_figure.dpi_scale_trans)
+        existing_axes = set(self.mpl_figure.axes)
+        # The subfigure's axes are added to pyplot's current figure
+        plt.figure(self.mpl_figure.number)
+        sub_figure = subplot.sub_figure
+        with decimated_data(sub_figure) if self.decimate else contextlib.nullcontext():
+            with script_patches():
+                multi_figure._prepare_sub_figure(
+                    sub_figure,
+                    self.grid,
+                    transformation=translation,
+                    reference_label=ascii_lowercase[subplot.index] + ")",
+                    legend=True,
+                    is_matplotlib_style=False,
+                )
+        multi_figure._reset_params_to_default(multi_figure, params_to_reset)
+        subplot.axes = [
+            axes for axes in self.mpl_figure.axes if axes not in existing_axes
+        ]
+        subplot.sections = used_sections(sub_figure, self.params)
+
+    def update(self, params: dict) -> bool:
+        """
+        Prepare again the subplots using the params sections which changed
+
+        Returns False if the changes affect the whole figure, which must then
+        be prepared again.
+        """
+        sections = changed_sections(self.params, params)
+        if MULTI_FIGURE_SECTIONS.intersection(sections):
+            return False
+        self.params = copy.deepcopy(params)
+        self.multi_figure._default_params = copy.deepcopy(params)
+        affected = [
+            subplot
+            for subplot in self.subplots
+            if subplot.sections is None or subplot.sections.intersection(sections)
+        ]
+        if len(self.dirty.union(affected)) * 2 > len(self.subplots):
+            # Drawing the whole figure again costs less than measuring most of it
+            self.prepare(params)
+            return True
+        for subplot in affected:
+            if subplot not in self.dirty:
+                # Area to redraw, the replaced axes cannot be measured later
+                subplot.extent = self.measure(subplot)
+            self.prepare_subplot(subplot)
+            self.dirty.add(subplot)
+            self.reprepared = True
+        self.multi_figure._rc_dict = {}
+        return True
+
+    def render(self, width: int, height: int, dpi: float, draft=False) -> Frame:
+        frame = None
+        if not draft and self.frame is not None:
+            frame = self.redraw_dirty_subplots(width, height, dpi)
+        if frame is None:
+            if not draft and self.reprepared:
+                # Axes prepared again come last in the figure, which can round
+                # its constrained layout differently (and e.g. move a legend at
+                # the best location), full frames are drawn from a new figure
+                self.prepare(self.params)
+            frame = render_frame(self.mpl_figure, width, height, dpi, draft)
+            if draft:
+                return frame
+            self.size = (width, height)
+            self.dpi = dpi
+            for subplot in self.subplots:
+                subplot.positions = [
+                    axes.get_position().bounds for axes in subplot.axes
+                ]
+        self.frame = frame
+        self.dirty = set()
+        return frame
+
+    def restore_layout(self, subplots) -> bool:
+        """
+        Put the figure and the axes of the subplots back to their size and
+        position in the last full quality frame
+
+        Returns False if a subplot does not have the same number of axes
+        anymore (e.g. a colorbar was added), the figure must then be laid out
+        again.
+        """
+        if any(len(subplot.axes) != len(subplot.positions) for subplot in subplots):
+            return False
+        width, height = self.size
+        self.mpl_figure.set_dpi(self.dpi)
+        self.mpl_figure.set_size_inches(width / self.dpi, height / self.dpi)
+        for subplot in subplots:
+            for axes, position in zip(subplot.axes, subplot.positions):
+                in_layout = axes.get_in_layout()
+                axes.set_position(position)
+                # set_position leaves the axes out of the next constrained layout
+                axes.set_in_layout(in_layout)
+        return True
+
+    def measure(self, subplot: Subplot):
+        """
+        Pixel extent of the axes of a subplot and their decorations in the
+        layout of the last full quality frame, None without such a frame
+        """
+        if self.frame is None or not self.restore_layout([subplot]):
+            return None
+        # Text extents only depend on the DPI, any renderer can measure them
+        renderer = RendererAgg(1, 1, self.dpi)
+        return Bbox.union([axes.get_tightbbox(renderer) for axes in subplot.axes])
+
+    def redraw_dirty_subplots(self, width, height, dpi):
+        """
+        Redraw the changed subplots over a copy of the last frame
+
+        The layout of the last frame is kept, so this returns None when its
+        size changed or when the decorations of the changed subplots do not
+        take the same space anymore (e.g. longer tick labels), in which case
+        the whole figure must be laid out and drawn again.
+        """
+        if not self.dirty:
+            return self.frame
+        if (width, height) != self.size or dpi != self.dpi:
+            return None
+        # Drafts were laid out at another resolution
+        if not self.restore_layout(self.subplots):
+            return None
+        regions = []
+        for subplot in self.dirty:
+            extent = self.measure(subplot)
+            if (
+                subplot.extent is None
+                or extent is None
+                or not np.allclose(extent.bounds, subplot.extent.bounds, atol=0.5)
+            ):
+                return None
+            regions.append(Bbox.union([extent, subplot.extent]).padded(2))
+
+        # The constrained layout keeps the subplots' decorations apart, the
+        # background and the changed axes are enough to redraw their regions
+        figure = self.mpl_figure
+        canvas = FigureCanvasAgg(figure)
+        renderer = canvas.get_renderer()
+        for artist in sorted(figure.get_children(), key=lambda a: a.get_zorder()):
+            if artist not in figure.axes:
+                artist.draw(renderer)
+        for subplot in self.dirty:
+            for axes in subplot.axes:
+                axes.draw(renderer)
+        scratch = np.asarray(renderer.buffer_rgba())
+        # The rendered size can be a pixel off the requested one
+        width, height = self.frame.width, self.frame.height
+        if scratch.shape[:2] != (height, width):
+            return None
+        pixels = np.frombuffer(self.frame.data, dtype=np.uint8)
+        pixels = pixels[: self.frame.nbytes].reshape(height, width, 4).copy()
+        for region in regions:
+            # Display coordinates start at the bottom of the figure
+            left = max(int(region.x0), 0)
+            right = min(int(np.ceil(region.x1)), width)
+            top = max(height - int(np.ceil(region.y1)), 0)
+            bottom = min(height - int(region.y0), height)
+            pixels[top:bottom, left:right] = scratch[top:bottom, left:right]
+        # Like in render_frame, the renderer's buffer must not be drawn into again
+        canvas._lastKey = None
+        return Frame(width, height, pixels, copies=1)
+
+
+@contextlib.contextmanager
+def kept_layout(mpl_figure):
+    """
+    Put the axes of a matplotlib figure back where they were laid out before
+    the body, e.g. a draft drawn at another resolution
+    """
+    positions = [
+        (axes, axes.get_position(original=True), axes.get_position())
+        for axes in mpl_figure.axes
+    ]
+    laid_out_size = laid_out_sizes.get(mpl_figure)
+    try:
+        yield
+    finally:
+        for axes, original, active in positions:
+            in_layout = axes.get_in_layout()
+            axes.set_position(original, "original")
+            axes.set_position(active, "active")
+            # set_position leaves the axes out of the next constrained layout
+            axes.set_in_layout(in_layout)
+        if laid_out_size is None:
+            laid_out_sizes.pop(mpl_figure, None)
+        else:
+            laid_out_sizes[mpl_figure] = laid_out_size
+
+
+def render_frame(
+    mpl_figure, width: int, height: int, dpi: float, draft=False
+) -> Frame:
+    """
+    Rasterize a matplotlib figure to a frame of about width x height pixels
+
+    Draft frames have a lower resolution and are drawn without antialiasing.
+    They leave the layout of the figure as it was, the next frames are laid
+    out from it.
+    """
+    scale = DRAFT_SCALE if draft else 1.0
+    with kept_layout(mpl_figure) if draft else contextlib.nullcontext():
+        mpl_figure.set_dpi(dpi * scale)
+        mpl_figure.set_size_inches(width / dpi, height / dpi)
+        canvas = FigureCanvasAgg(mpl_figure)
+        size = (width, height, dpi * scale)
+        if laid_out_sizes.get(mpl_figure) != size:
+            # The constrained layout of a draw uses the ticks chosen at the
+            # previous one, a first frame at this size is laid out like the
+            # later ones
+            mpl_figure.draw_without_rendering()
+            laid_out_sizes[mpl_figure] = size
+        if draft:
+            # Antialiasing is an artist property, restore it after drawing
+            artists = [
+                artist
+                for artist in mpl_figure.findobj()
+                if hasattr(artist, "get_antialiased")
+                and hasattr(artist, "set_antialiased")
+            ]
+            antialiased = [artist.get_antialiased() for artist in artists]
+            for artist in artists:
+                artist.set_antialiased(False)
+            with plt.rc_context(DRAFT_RC_PARAMS):
+                canvas.draw()
+            for artist, state in zip(artists, antialiased):
+                artist.set_antialiased(state)
+        else:
+            canvas.draw()
+    width, height = canvas.get_width_height(physical=True)
+    # The frame keeps the renderer's buffer, make sure the canvas never draws
+    # into it again (e.g. when saving at the same size)
+    canvas._lastKey = None
+    return Frame(width, height, canvas.buffer_rgba(), scale=scale)
+
+
+def script_figure_names(filepath: str, cache_dir=None) -> list:
+    """
+    Names of the GraphingLib figures defined by a figure script
+    """
+    plt.rcParams.update(plt.rcParamsDefault)
+    with ScriptFigures(filepath, cache_dir) as script:
+        return list(script.figures.keys())
+
+
+def render_script(
+    filepath: str,
+    params: dict,
+    width: int,
+    height: int,
+    dpi: float,
+    chosen=None,
+    draft=False,
+    shared=False,
+    cache_dir=None,
+    decimate=False,
+) -> Frame:
+    """
+    Execute a figure script and render one of its figures with the given params
+
+    With shared=True the frame is moved to shared memory so it can be returned
+    to another process with a single copy.
+
+    The last rendered MultiFigure is kept until another one is rendered. When
+    it is rendered again from the unchanged script, only the subplots affected
+    by the params change are prepared and redrawn.
+    """
+    global retained_multi_figure
+    plt.rcParams.update(plt.rcParamsDefault)
+    key = (
+        filepath,
+        script_hash(filepath, script_dependencies(filepath)),
+        chosen,
+        decimate,
+    )
+    retained = retained_multi_figure
+    try:
+        if retained is not None and retained.key == key and retained.update(params):
+            multi_figure = retained.preview.multi_figure
+            frame = retained.preview.render(width, height, dpi, draft)
+            frame.sections = used_sections(multi_figure, params)
+            frame.decimation = drawn_points(multi_figure) if decimate else None
+        else:
+            frame = render_script_figure(
+                key, params, width, height, dpi, draft, cache_dir
+            )
+    except BaseException:
+        release_retained_multi_figure()
+        raise
+    if shared:
+        frame.to_shared_memory()
+    return frame
+
+
+class RetainedMultiFigure:
+    def __init__(self, key, script, preview):
+        # (script path, script hash, requested figure name, decimation)
+        self.key = key
+        self.script = script
+        self.preview = preview
+
+    def update(self, params: dict) -> bool:
+        return self.preview.update(params)
+
+
+# MultiFigure kept prepared by this process since its last render, if any
+retained_multi_figure = None
+
+
+def release_retained_multi_figure():
+    global retained_multi_figure
+    if retained_multi_figure is not None:
+        retained_multi_figure.script.close()
+        retained_multi_figure = None
+
+
+def render_script_figure(key, params, width, height, dpi, draft, cache_dir):
+    global retained_multi_figure
+    filepath, _, chosen, decimate = key
+    script = ScriptFigures(filepath, cache_dir)
+    retained = False
+    try:
+        name = script.choose(chosen)
+        if isinstance(script.figures[name], gl.MultiFigure):
+            release_retained_multi_figure()
+        mpl_figure = script.prepare(name, params, decimate)
+        preview = script.multi_figures.get(name)
+        if preview is None:
+            frame = render_frame(mpl_figure, width, height, dpi, draft)
+        else:
+            frame = preview.render(width, height, dpi, draft)
+            retained_multi_figure = RetainedMultiFigure(key, script, preview)
+            retained = True
+        frame.sections = used_sections(script.figures[name], params)
+        if decimate:
+            frame.decimation = drawn_points(script.figures[name])
+    finally:
+        if not retained:
+            script.close()
+    return frame
+
+
+def export_script(
+    filepath: str,
+    params: dict,
+    chosen,
+    width: float,
+    height: float,
+    output_path: str,
+    format: str,
+    dpi: int,
+    cache_dir=None,
+) -> str:
+    """
+    Execute a figure script and save one of its figures with the given params
+    """
+    plt.rcParams.update(plt.rcParamsDefault)
+    with ScriptFigures(filepath, cache_dir) as script:
+        mpl_figure = script.prepare(script.choose(chosen), params)
+        mpl_figure.set_size_inches(width, height)
+        mpl_figure.set_dpi(dpi)
+        # Laid out like the frames of the preview, see render_frame
+        mpl_figure.draw_without_rendering()
+        mpl_figure.savefig(output_path, format=format, dpi=dpi)
+    return output_path
+
+
+def use_offscreen_backend():
+    # Figures are only rasterized by Agg, an interactive backend would create a
+    # hidden window, canvas and toolbar for each figure made through pyplot
+    matplotlib.use("Agg")
+
+
+def init_render_worker():
+    # Worker processes never display anything
+    use_offscreen_backend()
+
+
+def element_section(element, params: dict):
+    """
+    Name of the params section GraphingLib uses to style an element
+    """
+    for cls in type(element).__mro__:
+        if cls.__name__ in params:
+            return cls.__name__
+    return None
+
+
+def used_sections(figure, params: dict):
+    """
+    Set of params sections consumed when preparing a Figure or MultiFigure
+
+    Returns None if the figure could not be analyzed, in which case every
+    section should be considered used.
+    """
+    sections = {"rc_params"}
+    if isinstance(figure, gl.MultiFigure):
+        sections.add("MultiFigure")
+        figures = list(figure._sub_figures)
+    elif isinstance(figure, gl.Figure):
+        figures = [figure]
+    else:
+        return None
+    for fig in figures:
+        sections.add("Figure")
+        elements = list(fig._elements)
+        for twin in (fig._twin_x_axis, fig._twin_y_axis):
+            if twin is not None:
+                elements += twin._elements
+        for element in elements:
+            section = element_section(element, params)
+            if section is not None:
+                sections.add(section)
+    return sections
@@ -0,0 +1,87 @@
+import os
+
+import graphinglib as gl
+import yaml
+from PySide6.QtCore import QCoreApplication, QEventLoop
+
+from .export import ExportQueue
+
+FIGURES_DIR = os.path.join(os.path.dirname(__file__), "figures")
+CONTACT_SHEET_NAME = "sample_sheet.png"
+
+
+def example_scripts() -> dict:
+    """
+    {name: script path} of the example figures, sorted by name
+    """
+    return {
+        os.path.splitext(f)[0]: os.path.join(FIGURES_DIR, f)
+        for f in sorted(os.listdir(FIGURES_DIR))
+        if f.endswith(".py")
+    }
+
+
+def load_style(style: str) -> dict:
+    """
+    Load the params of a GraphingLib style from its name or a .yml file
+    """
+    if os.path.isfile(style):
+        with open(style) as file:
+            return yaml.safe_load(file)
+    return gl.file_manager.FileLoader(style).load()
+
+
+def sample_sheet_outputs(output_dir: str, formats, dpi: int):
+    """
+    List the (script, chosen, path, format, dpi) exports of a sample sheet
+
+    PNGs are always rendered since the contact sheet is made from them.
+    """
+    formats = [format.lower() for format in formats]
+    if "png" not in formats:
+        formats.insert(0, "png")
+    outputs = []
+    for name, script in example_scripts().items():
+        for format in formats:
+            path = os.path.join(output_dir, f"{name}.{format}")
+            outputs.append((script, None, path, format, dpi))
+    return outputs
+
+
+def render_sample_sheet(
+    params: dict,
+    output_dir: str,
+    formats=("png",),
+    dpi=200,
+    max_workers=None,
+    progress=None,
+):
+    """
+    Render every example figure with the given params in an export queue
+
+    Writes one file per example and format, and a contact sheet PNG of all the
+    examples. progress(done, total) is called after each file. Returns the
+    written paths and the error messages.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    width, height = params["Figure"]["_size"]
+    # The replies of the workers are delivered by the Qt event loop
+    app = QCoreApplication.instance() or QCoreApplication([])
+    queue = ExportQueue(max_workers)
+    if progress is not None:
+        # The queue reports 0/0 once its last job is finished
+        queue.progress.connect(lambda done, total: total and progress(done, total))
+    loop = QEventLoop(app)
+    queue.jobFinished.connect(loop.quit)
+    job = queue.submit_job(
+        params,
+        width,
+        height,
+        sample_sheet_outputs(output_dir, formats, dpi),
+        os.path.join(output_dir, CONTACT_SHEET_NAME),
+    )
+    try:
+        loop.exec()
+    finally:
+        queue.shutdown()
+    return job.written, job.errors
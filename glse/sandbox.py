@@ -0,0 +1,243 @@
+import itertools
+import os
+import threading
+from multiprocessing import get_context
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+try:
+    import resource
+except ImportError:
+    # Memory limits are not available on Windows
+    resource = None
+
+# A task running longer than this (in seconds) has its worker killed
+SANDBOX_TIMEOUT = 30
+# Address space available to each worker process
+SANDBOX_MEMORY_LIMIT = 2 * 1024**3
+
+
+def sandbox_main(conn, memory_limit, initializer):
+    """
+    Loop of a sandbox worker process, running the (task_id, function, args)
+    tasks received on conn and sending back (task_id, ok, result or error)
+    """
+    if resource is not None and memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        task_id, function, args = message
+        try:
+            reply = (task_id, True, function(*args))
+        except BaseException as error:
+            reply = (task_id, False, f"{type(error).__name__}: {error}")
+        try:
+            conn.send(reply)
+        except Exception as error:
+            # The result could not be pickled
+            conn.send((task_id, False, f"{type(error).__name__}: {error}"))
+
+
+class SandboxTask:
+    def __init__(self, task_id, key, function, args):
+        self.task_id = task_id
+        self.key = key
+        self.function = function
+        self.args = args
+        self.worker = None
+        self.timer = None
+
+
+class SandboxWorker:
+    """
+    Worker process of a sandbox pool and the thread reading its replies
+    """
+
+    def __init__(self, pool):
+        context = get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=sandbox_main,
+            args=(child_conn, pool.memory_limit, pool.initializer),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.reader = threading.Thread(target=self.read, args=(pool,), daemon=True)
+        self.reader.start()
+
+    def read(self, pool):
+        # Signals emitted from this thread are queued to the GUI thread
+        while True:
+            try:
+                task_id, ok, value = self.conn.recv()
+            except (EOFError, OSError):
+                pool.workerExited.emit(self)
+                return
+            pool.replyReceived.emit(self, task_id, ok, value)
+
+    def kill(self):
+        self.process.kill()
+        self.conn.close()
+
+
+class SandboxPool(QObject):
+    """
+    Persistent pool of worker processes running untrusted code
+
+    Each task runs in a worker with a limited address space. Tasks exceeding
+    the timeout or cancelled while running get their worker killed and
+    replaced, so a hanging or crashing script never affects the editor.
+    """
+
+    taskFinished = Signal(object, object)
+    taskFailed = Signal(object, str)
+    # Emitted by the reader threads of the workers
+    replyReceived = Signal(object, int, bool, object)
+    workerExited = Signal(object)
+
+    def __init__(
+        self,
+        max_workers=None,
+        timeout=SANDBOX_TIMEOUT,
+        memory_limit=SANDBOX_MEMORY_LIMIT,
+        initializer=None,
+    ):
+        super().__init__()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.initializer = initializer
+        self.workers = []
+        self.queue = []
+        self.task_ids = itertools.count()
+        self.replyReceived.connect(self.on_reply)
+        self.workerExited.connect(self.on_worker_exited)
+
+    def submit(self, key, function, *args) -> SandboxTask:
+        """
+        Queue function(*args), its result is emitted with taskFinished(key, result)
+        """
+        task = SandboxTask(next(self.task_ids), key, function, args)
+        self.queue.append(task)
+        self.dispatch()
+        return task
+
+    def cancel_queued(self, task) -> bool:
+        if task in self.queue:
+            self.queue.remove(task)
+            return True
+        return False
+
+    def prioritize(self, task):
+        """
+        Move a queued task to the front of the queue
+        """
+        if task in self.queue:
+            self.queue.remove(task)
+            self.queue.insert(0, task)
+
+    def cancel(self, task):
+        """
+        Drop a queued task, or kill the worker of a running one
+        """
+        if task in self.queue:
+            self.queue.remove(task)
+        elif task.worker is not None:
+            self.restart(task.worker)
+            self.finish(task)
+            self.dispatch()
+
+    def dispatch(self):
+        while self.queue:
+            idle = [worker for worker in self.workers if worker.task is None]
+            if idle:
+                worker = idle[0]
+            elif len(self.workers) < self.max_workers:
+                worker = SandboxWorker(self)
+                self.workers.append(worker)
+            else:
+                return
+            task = self.queue.pop(0)
+            task.worker = worker
+            worker.task = task
+            if self.timeout:
+                task.timer = QTimer(self)
+                task.timer.setSingleShot(True)
+                task.timer.timeout.connect(lambda task=task: self.on_timeout(task))
+                task.timer.start(int(self.timeout * 1000))
+            try:
+                worker.conn.send((task.task_id, task.function, task.args))
+            except Exception as error:
+                self.finish(task)
+                self.taskFailed.emit(task.key, f"{type(error).__name__}: {error}")
+
+    def finish(self, task):
+        if task.timer is not None:
+            task.timer.stop()
+            task.timer.deleteLater()
+            task.timer = None
+        if task.worker is not None and task.worker.task is task:
+            task.worker.task = None
+        task.worker = None
+
+    def restart(self, worker):
+        # The replacement is started lazily by the next dispatch
+        self.workers.remove(worker)
+        worker.kill()
+
+    def on_reply(self, worker, task_id, ok, value):
+        task = worker.task
+        if task is None or task.task_id != task_id:
+            return
+        self.finish(task)
+        if ok:
+            self.taskFinished.emit(task.key, value)
+        else:
+            self.taskFailed.emit(task.key, value)
+        self.dispatch()
+
+    def on_worker_exited(self, worker):
+        if worker not in self.workers:
+            # Killed on purpose
+            return
+        self.workers.remove(worker)
+        worker.process.join()
+        task = worker.task
+        if task is not None:
+            self.finish(task)
+            self.taskFailed.emit(
+                task.key, f"Worker process exited with code {worker.process.exitcode}"
+            )
+        self.dispatch()
+
+    def on_timeout(self, task):
+        if task.worker is None:
+            return
+        self.restart(task.worker)
+        self.finish(task)
+        self.taskFailed.emit(task.key, f"Timed out after {self.timeout} s")
+        self.dispatch()
+
+    def shutdown(self):
+        self.queue.clear()
+        for worker in self.workers:
+            if worker.task is not None:
+                self.finish(worker.task)
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.process.join(1)
+            if worker.process.is_alive():
+                worker.kill()
+        self.workers = []
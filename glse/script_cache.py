@@ -0,0 +1,171 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import shutil
+import sys
+import sysconfig
+
+# Read-only opens recorded while a script runs, None when not tracking
+tracked_opens = None
+audit_hook_installed = False
+
+
+def audit_hook(event, args):
+    if event != "open" or tracked_opens is None:
+        return
+    path, mode, flags = args
+    if not isinstance(path, (str, bytes)):
+        return
+    if mode is None:
+        read_only = flags & os.O_ACCMODE == os.O_RDONLY
+    else:
+        read_only = "r" in mode and "+" not in mode
+    if read_only:
+        tracked_opens.append(os.fsdecode(path))
+
+
+class track_opened_files:
+    """
+    Context manager collecting the paths of the files opened for reading
+
+    Audit hooks cannot be removed, the hook is installed once and only records
+    opens inside this context.
+    """
+
+    def __enter__(self):
+        global tracked_opens, audit_hook_installed
+        if not audit_hook_installed:
+            sys.addaudithook(audit_hook)
+            audit_hook_installed = True
+        self.previous = tracked_opens
+        tracked_opens = []
+        return tracked_opens
+
+    def __exit__(self, *exc_info):
+        global tracked_opens
+        tracked_opens = self.previous
+
+
+def installation_dirs():
+    dirs = {sys.prefix, sys.base_prefix, sys.exec_prefix}
+    dirs.update(sysconfig.get_paths().values())
+    return [os.path.abspath(path) for path in dirs]
+
+
+def data_files(paths, script_path):
+    """
+    Files a script depends on among the ones it opened
+
+    Python installation files (imported packages, fonts...) are left out and
+    bytecode is replaced by its source.
+    """
+    excluded_dirs = installation_dirs()
+    files = set()
+    for path in paths:
+        path = os.path.abspath(path)
+        if path.endswith(".pyc"):
+            # Local modules are read from their bytecode, depend on the source
+            try:
+                path = importlib.util.source_from_cache(path)
+            except ValueError:
+                continue
+        if path == script_path or not os.path.isfile(path):
+            continue
+        if any(path.startswith(directory + os.sep) for directory in excluded_dirs):
+            continue
+        files.add(path)
+    return sorted(files)
+
+
+def content_hash(filepath: str) -> str:
+    digest = hashlib.sha1()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1024**2), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def entry_paths(script_path: str, cache_dir: str):
+    """
+    Metadata and pickle paths of the cache entry of a script's current contents
+    """
+    key = hashlib.sha1(
+        (script_path + content_hash(script_path)).encode()
+    ).hexdigest()
+    base = os.path.join(cache_dir, key)
+    return base + ".json", base + ".pickle"
+
+
+def file_state(path: str):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns, content_hash(path)]
+
+
+def is_file_unchanged(path: str, state) -> bool:
+    size, mtime_ns, digest = state
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+        return True
+    # Touched but maybe not modified
+    return stat.st_size == size and content_hash(path) == digest
+
+
+def load_cached_figures(filepath: str, cache_dir: str):
+    """
+    Figures stored for this script if neither it nor its data files changed
+
+    Returns None on a cache miss.
+    """
+    script_path = os.path.abspath(filepath)
+    metadata_path, pickle_path = entry_paths(script_path, cache_dir)
+    try:
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        if not all(
+            is_file_unchanged(path, state) for path, state in metadata["files"].items()
+        ):
+            return None
+        with open(pickle_path, "rb") as file:
+            return pickle.load(file)
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def store_cached_figures(filepath: str, cache_dir: str, figures: dict, opened_files):
+    """
+    Store the figures of a script with the state of the files it opened
+
+    Figures which cannot be pickled (e.g. holding lambdas) are not cached.
+    """
+    script_path = os.path.abspath(filepath)
+    try:
+        data = pickle.dumps(figures, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return False
+    os.makedirs(cache_dir, exist_ok=True)
+    metadata_path, pickle_path = entry_paths(script_path, cache_dir)
+    metadata = {
+        "script": script_path,
+        "files": {
+            path: file_state(path) for path in data_files(opened_files, script_path)
+        },
+    }
+    # Written under temporary names so concurrent workers never read half a file
+    for path, content, mode in (
+        (pickle_path, data, "wb"),
+        (metadata_path, json.dumps(metadata), "w"),
+    ):
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, mode) as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+    return True
+
+
+def clear_cache(cache_dir: str):
+    shutil.rmtree(cache_dir, ignore_errors=True)
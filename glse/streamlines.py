@@ -0,0 +1,47 @@
+from matplotlib.collections import LineCollection
+from matplotlib.patches import FancyArrowPatch
+
+from .mappables import element_artists
+
+# Params of a stream plot changed on its drawn lines and arrows, without
+# integrating its vector field again
+STREAM_STYLE_PARAMS = ("_line_width", "_color", "_color_map", "_arrow_size")
+
+
+def stream_restyle(stream, changes: dict):
+    """
+    Function giving the streamlines and arrows last drawn by a stream plot
+    their new style in place, None if it must be drawn again
+
+    The changes are {param: new value} of the stream plot's params section.
+    """
+    lines = element_artists(stream, LineCollection)
+    arrows = element_artists(stream, FancyArrowPatch)
+    if not lines:
+        return None
+    lines = lines[0]
+    # Lines colored by an array of values map them through the colormap, and
+    # their arrows were given the mapped colors when drawn
+    multicolor = lines.get_array() is not None
+    updates = []
+    for key, value in changes.items():
+        if key in ("_color", "_color_map") and multicolor:
+            return None
+        if key == "_color_map":
+            # Single colored lines do not use the colormap
+            continue
+        if key not in STREAM_STYLE_PARAMS or value in (None, "default"):
+            return None
+        if key == "_line_width":
+            updates += [(artist.set_linewidth, value) for artist in [lines, *arrows]]
+        elif key == "_color":
+            updates += [(artist.set_color, value) for artist in [lines, *arrows]]
+        elif key == "_arrow_size":
+            # streamplot scales its arrow style by 10 times the arrow size
+            updates += [(arrow.set_mutation_scale, 10 * value) for arrow in arrows]
+
+    def restyle():
+        for setter, value in updates:
+            setter(value)
+
+    return restyle
@@ -0,0 +1,220 @@
+import json
+import operator
+import os
+import re
+
+import graphinglib as gl
+import yaml
+from matplotlib.colors import is_color_like, to_hex
+from PySide6.QtCore import QStandardPaths
+
+# Bumped when the stored entries change shape, older indexes are rebuilt
+INDEX_VERSION = 1
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "~": None,
+}
+# LibYAML's loader when PyYAML was built with it, parsing is most of the cost
+# of indexing a style
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+QUERY_PATTERN = re.compile(r"^\s*(\S+?)\s*(?:(==|!=|>=|<=|=|>|<|~)\s*(.*?))?\s*$")
+
+
+def default_index_path():
+    return os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+        "glse",
+        "style_index.json",
+    )
+
+
+def style_dirs():
+    """
+    [(origin, directory)] of the custom and built-in style files
+    """
+    # Where GraphingLib's own loader looks for a style, so the index follows
+    # it if it ever moves
+    loader = gl.file_manager.FileLoader("")
+    return [
+        ("custom", os.path.dirname(loader._file_location_customs)),
+        ("gl", os.path.dirname(loader._file_location_defaults)),
+    ]
+
+
+def flatten_params(params) -> dict:
+    """
+    {section: {key: value}} of a style file, with JSON-compatible values
+    """
+    if not isinstance(params, dict):
+        return {}
+    flat = {}
+    for section, values in params.items():
+        if isinstance(values, dict):
+            flat[str(section)] = {
+                str(key): json.loads(json.dumps(value, default=str))
+                for key, value in values.items()
+            }
+    return flat
+
+
+def normalized(value):
+    """
+    Form of a value compared by queries, numbers as floats and colors as hex
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip().strip("\"'")
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        if text.lower() in ("true", "false"):
+            return text.lower() == "true"
+        if is_color_like(text):
+            return to_hex(text, keep_alpha=True)
+        return text.lower()
+    return json.dumps(value)
+
+
+class StyleQuery:
+    """
+    Parsed form of "Section.key", "Section.key OP value" or "rc.key OP value"
+
+    Keys whose first part is not a style section are rc params, so
+    "axes.facecolor = #1e1e1e" looks in the rc_params section. OP is one of
+    =, !=, >, >=, <, <= or ~ (contains, case insensitive).
+    """
+
+    def __init__(self, text: str, sections):
+        match = QUERY_PATTERN.match(text)
+        if match is None or (match[2] is not None and not match[3]):
+            raise ValueError(f"Invalid query: {text!r}")
+        param, self.operator, value = match.groups()
+        section, _, key = param.partition(".")
+        if section in sections and key:
+            self.section, self.key = section, key
+        else:
+            self.section, self.key = "rc_params", param
+        self.text = value
+        self.value = None if value is None else normalized(value)
+        if self.operator in (">", ">=", "<", "<=") and not isinstance(
+            self.value, float
+        ):
+            raise ValueError(f"{self.operator} needs a number, not {value!r}")
+
+    def matches(self, value) -> bool:
+        if self.operator is None:
+            return True
+        if self.operator == "~":
+            return self.text.lower() in str(value).lower()
+        value = normalized(value)
+        compare = OPERATORS[self.operator]
+        if self.operator in ("=", "==", "!="):
+            return compare(value, self.value)
+        return isinstance(value, float) and compare(value, self.value)
+
+
+class StyleIndex:
+    """
+    Params of every custom and built-in style, stored in a JSON file
+
+    refresh only parses the style files added or modified since the index was
+    last saved, found from their size and modification time.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        self.entries = {}
+        # (section, key) -> {style name: value} of the styles loaded by name
+        self.postings = None
+        self.section_names = set()
+        try:
+            with open(self.path) as file:
+                stored = json.load(file)
+            if stored.get("version") == INDEX_VERSION:
+                self.entries = stored["entries"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def refresh(self):
+        entries = {}
+        changed = False
+        for origin, directory in style_dirs():
+            try:
+                files = list(os.scandir(directory))
+            except OSError:
+                continue
+            for file in files:
+                if not file.name.endswith(".yml") or not file.is_file():
+                    continue
+                stat = file.stat()
+                state = [stat.st_size, stat.st_mtime_ns]
+                entry = self.entries.get(file.path)
+                if entry is None or entry["state"] != state:
+                    try:
+                        with open(file.path) as stream:
+                            params = flatten_params(yaml.load(stream, YAML_LOADER))
+                    except (OSError, yaml.YAMLError):
+                        continue
+                    entry = {
+                        "name": os.path.splitext(file.name)[0],
+                        "origin": origin,
+                        "state": state,
+                        "params": params,
+                    }
+                    changed = True
+                entries[file.path] = entry
+        if changed or entries.keys() != self.entries.keys():
+            self.entries = entries
+            self.save()
+            self.postings = None
+        if self.postings is None:
+            self.build_postings()
+        return self
+
+    def save(self):
+        # Written under a temporary name so concurrent readers never see half
+        # an index
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, file)
+        os.replace(temporary_path, self.path)
+
+    def build_postings(self):
+        self.postings = {}
+        loaded = set()
+        # Custom styles hide the built-in styles they override
+        for entry in sorted(
+            self.entries.values(), key=lambda entry: entry["origin"] != "custom"
+        ):
+            if entry["name"] in loaded:
+                continue
+            loaded.add(entry["name"])
+            for section, values in entry["params"].items():
+                for key, value in values.items():
+                    self.postings.setdefault((section, key), {})[entry["name"]] = value
+        self.section_names = {section for section, _ in self.postings}
+
+    def search(self, text: str):
+        """
+        Sorted [(style, section, key, value)] of the styles matching a query
+        """
+        if self.postings is None:
+            self.refresh()
+        query = StyleQuery(text, self.section_names)
+        values = self.postings.get((query.section, query.key), {})
+        return [
+            (name, query.section, query.key, value)
+            for name, value in sorted(values.items())
+            if query.matches(value)
+        ]
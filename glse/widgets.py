@@ -1,9 +1,10 @@
 from typing import Optional
 
-import matplotlib as mpl
 from matplotlib.colors import is_color_like, to_hex
 from cycler import cycler
 from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
     QSortFilterProxyModel,
     QStringListModel,
     Qt,
@@ -17,14 +18,14 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QColorDialog,
     QComboBox,
+    QFileDialog,
     QHBoxLayout,
     QHeaderView,
     QLabel,
     QLineEdit,
     QListView,
-    QListWidget,
-    QListWidgetItem,
     QMainWindow,
+    QMessageBox,
     QPushButton,
     QSlider,
     QTableWidget,
@@ -34,6 +35,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from .rc_import import read_rc_file, parse_rc_text, to_editor_value, validate_rc_value
+
 
 class ColorButton(QPushButton):
     colorChanged = Signal(str)
@@ -331,6 +334,9 @@ class Slider(QWidget):
         self.slider.setTickPosition(QSlider.TicksBelow)
         self.slider.setTickInterval(tick_interval)
         self.slider.valueChanged.connect(self.onValueChanged)
+        # Draft previews are rendered while the handle is dragged
+        self.slider.sliderPressed.connect(self.the_window.begin_interaction)
+        self.slider.sliderReleased.connect(self.the_window.end_interaction)
         self.setEnabled(
             not isinstance(
                 self.the_window.params[self.first_param_section][
@@ -551,96 +557,193 @@ class ListOptions(QWidget):
         return None
 
 
-class IndicatorListWidget(QWidget):
-    def __init__(self):
-        super().__init__()
+# Indicator icons by (is_gl, has_gl_twin), painted once and shared by every row
+indicator_icons = {}
 
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.SingleSelection)
-        self.layout = QVBoxLayout()
-        self.layout.addWidget(self.list_widget)
-        self.setLayout(self.layout)
 
-        # Add items to the list with indicators
+def indicator_icon(is_gl, has_gl_twin=False):
+    key = (is_gl, has_gl_twin)
+    if key not in indicator_icons:
+        indicator_icons[key] = create_indicator_icon(is_gl, has_gl_twin)
+    return indicator_icons[key]
 
-        # Sort items by their indicator color
-        self.sort_items()
 
-    def create_indicator_icon(self, is_gl, has_gl_twin=False):
-        # Create a QPixmap object to draw on
-        pixmap = QPixmap(40, 20)  # Increase width to accommodate two icons
-        pixmap.fill(Qt.transparent)  # Ensure the background is transparent
+def create_indicator_icon(is_gl, has_gl_twin=False):
+    # Create a QPixmap object to draw on
+    pixmap = QPixmap(40, 20)  # Increase width to accommodate two icons
+    pixmap.fill(Qt.transparent)  # Ensure the background is transparent
 
-        painter = QPainter(pixmap)
-        colors = ["#3e82a0", "#edb73b", "#8aba4e"]
-        # 3 color options. Teal for GL, Amber for non-GL, and Taupe for GL twin
-        if is_gl and not has_gl_twin:  # GL
-            color = QColor(colors[0])
-            painter.setBrush(color)
-            painter.drawEllipse(3, 3, 14, 14)  # Draw a filled circle
-        elif not is_gl and not has_gl_twin:  # Custom
-            color = QColor(colors[1])
-            painter.setBrush(color)
-            painter.drawRect(3, 3, 14, 14)  # Draw a filled square
-        elif not is_gl and has_gl_twin:  # Custom with GL twin
-            color = QColor(colors[2])
-            painter.setBrush(color)
-            # Draw a filled triangle
-            painter.drawPolygon([QPoint(3, 17), QPoint(17, 17), QPoint(10, 3)])
-        else:
-            raise ValueError("Invalid combination of is_gl and has_gl_twin")
+    painter = QPainter(pixmap)
+    colors = ["#3e82a0", "#edb73b", "#8aba4e"]
+    # 3 color options. Teal for GL, Amber for non-GL, and Taupe for GL twin
+    if is_gl and not has_gl_twin:  # GL
+        color = QColor(colors[0])
+        painter.setBrush(color)
+        painter.drawEllipse(3, 3, 14, 14)  # Draw a filled circle
+    elif not is_gl and not has_gl_twin:  # Custom
+        color = QColor(colors[1])
+        painter.setBrush(color)
+        painter.drawRect(3, 3, 14, 14)  # Draw a filled square
+    elif not is_gl and has_gl_twin:  # Custom with GL twin
+        color = QColor(colors[2])
+        painter.setBrush(color)
+        # Draw a filled triangle
+        painter.drawPolygon([QPoint(3, 17), QPoint(17, 17), QPoint(10, 3)])
+    else:
+        raise ValueError("Invalid combination of is_gl and has_gl_twin")
 
-        painter.end()
+    painter.end()
 
-        return QIcon(pixmap)
+    return QIcon(pixmap)
 
-    def _add_item(self, text, is_gl, has_gl_twin=False):
+
+class StyleListModel(QAbstractListModel):
+    """
+    Style names with their indicator state, in insertion order
+
+    Rows are inserted, removed and changed one at a time so views only update
+    the affected rows.
+    """
+
+    # Custom styles first, then built-in ones, each by name
+    SortRole = Qt.UserRole + 1
+    # "1" for the styles shown by the filter of the proxy model, else "0"
+    MatchRole = Qt.UserRole + 2
+    # Looking up Qt enums is slow, and data is called for every comparison
+    # while sorting
+    DisplayRole = Qt.DisplayRole
+    DecorationRole = Qt.DecorationRole
+    StateRole = Qt.UserRole
+    ToolTipRole = Qt.ToolTipRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.states = {}
+        # {style name: matched params} of the last search, None shows every style
+        self.matches = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        if role == self.SortRole:
+            return f"{int(self.states[name][0])}{name}"
+        if role == self.DisplayRole:
+            return name
+        if role == self.DecorationRole:
+            return indicator_icon(*self.states[name])
+        if role == self.StateRole:
+            return self.states[name]
+        if role == self.MatchRole:
+            return "1" if self.matches is None or name in self.matches else "0"
+        if role == self.ToolTipRole and self.matches:
+            return self.matches.get(name)
+        return None
+
+    def set_matches(self, matches):
+        self.matches = matches
+        if self.names:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self.names) - 1),
+                [self.MatchRole, self.ToolTipRole],
+            )
+
+    def set_styles(self, states: dict):
+        # Replaces every row at once, for the initial list of styles
+        self.beginResetModel()
+        self.names = list(states)
+        self.states = dict(states)
+        self.endResetModel()
+
+    def set_style(self, name, is_gl, has_gl_twin=False):
         # Check that not both is_gl and has_gl_twin are True
         if is_gl and has_gl_twin:
             raise ValueError(
                 "Both is_gl and has_gl_twin cannot be True. has_gl_twin is reserved for custom styles that share a name with a built-in style."
             )
-        # Add item to the list widget with an indicator icon
-        item = QListWidgetItem(text)
-        item.setData(Qt.UserRole, (is_gl, has_gl_twin))
-        icon = self.create_indicator_icon(is_gl, has_gl_twin)
-        item.setIcon(icon)
-        self.list_widget.addItem(item)
+        if name in self.states:
+            self.states[name] = (is_gl, has_gl_twin)
+            index = self.index(self.names.index(name))
+            self.dataChanged.emit(index, index)
+            return
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.names.append(name)
+        self.states[name] = (is_gl, has_gl_twin)
+        self.endInsertRows()
+
+    def remove_style(self, name):
+        if name not in self.states:
+            return
+        row = self.names.index(name)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.names[row]
+        del self.states[name]
+        self.endRemoveRows()
+
+
+class IndicatorListWidget(QWidget):
+    currentTextChanged = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+
+        self.model = StyleListModel(self)
+        # Sorted by their indicator state, then by their text, and kept sorted
+        # as rows are inserted and changed
+        self.proxyModel = QSortFilterProxyModel(self)
+        self.proxyModel.setSourceModel(self.model)
+        self.proxyModel.setSortRole(StyleListModel.SortRole)
+        self.proxyModel.setFilterRole(StyleListModel.MatchRole)
+        self.proxyModel.setFilterFixedString("1")
+        self.proxyModel.setDynamicSortFilter(True)
+        self.proxyModel.sort(0)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxyModel)
+        self.list_view.setSelectionMode(QListView.SingleSelection)
+        # Every row has the same height, no need to measure each one
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.selectionModel().currentChanged.connect(
+            self.onCurrentChanged
+        )
+        self.layout = QVBoxLayout()
+        self.layout.addWidget(self.list_view)
+        self.setLayout(self.layout)
+
+    def onCurrentChanged(self, current, previous):
+        self.currentTextChanged.emit(current.data(Qt.DisplayRole) or "")
+
+    def clear_selection(self):
+        self.list_view.setCurrentIndex(QModelIndex())
 
     def add_item(self, text, is_gl, has_gl_twin=False):
-        # add and then sort items
-        self._add_item(text, is_gl, has_gl_twin)
-        self.sort_items()
+        # Inserted or changed in place, the proxy model keeps the order
+        self.model.set_style(text, is_gl, has_gl_twin)
+
+    def remove_item(self, text):
+        self.model.remove_style(text)
+
+    def filter_items(self, matches):
+        # Only the styles in matches are shown, all of them when it is None
+        self.model.set_matches(matches)
 
     def add_items(self, gl_items, custom_items):
         # Add items to the list with indicators
+        states = {}
         for item in custom_items:
             if item is None or item == "":
                 continue
-            if item in gl_items:
-                self._add_item(item, is_gl=False, has_gl_twin=True)
-            else:
-                self._add_item(item, is_gl=False, has_gl_twin=False)
+            states[item] = (False, item in gl_items)
         for item in gl_items:
-            if item not in custom_items:
-                self._add_item(item, is_gl=True, has_gl_twin=False)
-
-        # Sort items by their indicator color
-        self.sort_items()
-
-    def sort_items(self):
-        # Sort items by their indicator state
-        items = []
-        for index in range(self.list_widget.count()):
-            item = self.list_widget.item(index)
-            items.append((item.data(Qt.UserRole), item.text()))
-
-        # Sort items by their indicator state (reversed), and then by their text
-        items.sort(key=lambda x: (x[0][0], x[1]))
-
-        self.list_widget.clear()
-        for state, text in items:
-            self._add_item(text, *state)
+            if item not in states:
+                states[item] = (True, False)
+        self.model.set_styles(states)
 
 
 class IconLabel(QWidget):
@@ -709,14 +812,21 @@ class TableWidget(QWidget):
 
         self.updating = False
         self.first_table_resize = False
+        self.status_icons = {}
         self.addButton = QPushButton("Add Row")
         self.deleteButton = QPushButton("Delete Row")
+        self.importButton = QPushButton("Import File")
+        self.pasteButton = QPushButton("Paste")
         self.addButton.clicked.connect(self.addRow)
         self.deleteButton.clicked.connect(self.deleteRow)
+        self.importButton.clicked.connect(self.importFromFile)
+        self.pasteButton.clicked.connect(self.importFromClipboard)
 
         buttonLayout = QHBoxLayout()
         buttonLayout.addWidget(self.addButton)
         buttonLayout.addWidget(self.deleteButton)
+        buttonLayout.addWidget(self.importButton)
+        buttonLayout.addWidget(self.pasteButton)
         self.layout.addLayout(buttonLayout)
 
         self.handled_elsewhere = [
@@ -825,6 +935,76 @@ class TableWidget(QWidget):
             self.the_window.update_rc_params_from_table(valid_data)
             self.updating = False
 
+    def importFromFile(self):
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import rcParams",
+            "",
+            "Matplotlib style files (*.mplstyle matplotlibrc *.rc);;All Files (*)",
+        )
+        if filepath:
+            try:
+                rc_params, bad_lines = read_rc_file(filepath)
+            except (OSError, UnicodeDecodeError) as e:
+                QMessageBox.warning(self, "Import rcParams", str(e))
+                return
+            self.importRcParams(rc_params, bad_lines)
+
+    def importFromClipboard(self):
+        rc_params, bad_lines = parse_rc_text(QApplication.clipboard().text())
+        self.importRcParams(rc_params, bad_lines)
+
+    def importRcParams(self, rc_params: dict, bad_lines=()):
+        """
+        Add a whole batch of rcParams to the table with a single figure update
+
+        Keys handled elsewhere in GLSE are sent to their dedicated widgets.
+        """
+        if self.updating or not (rc_params or bad_lines):
+            return
+        self.updating = True
+        self.table.setUpdatesEnabled(False)
+        rows = {
+            self.table.item(row, 0).text(): row
+            for row in range(self.table.rowCount())
+            if self.table.item(row, 0)
+        }
+        handled = {}
+        rejected = list(bad_lines)
+        for key, value in rc_params.items():
+            if key in self.handled_elsewhere:
+                try:
+                    handled[key] = to_editor_value(key, validate_rc_value(key, value))
+                except (ValueError, TypeError) as e:
+                    rejected.append(f"{key}: {e}")
+                continue
+            if key in rows:
+                row = rows[key]
+                self.table.item(row, 1).setText(value)
+            else:
+                row = self.table.rowCount()
+                self.table.insertRow(row)
+                self.table.setItem(row, 0, QTableWidgetItem(key))
+                self.table.setItem(row, 1, QTableWidgetItem(value))
+                statusItem = QTableWidgetItem("")
+                statusItem.setFlags(statusItem.flags() & ~Qt.ItemIsEditable)
+                statusItem.setTextAlignment(Qt.AlignCenter)
+                self.table.setItem(row, 2, statusItem)
+                rows[key] = row
+            if not self.validateRow(row):
+                rejected.append(f"{key}: invalid value {value!r}")
+        self.table.setUpdatesEnabled(True)
+        self.updateTableHeight()
+        self.updating = False
+
+        # May rebuild the tabs (and this widget) if handled keys were imported
+        self.the_window.import_rc_params(self.getTableData(), handled)
+
+        if rejected:
+            msg = "The following lines were not imported or are invalid:\n\n"
+            msg += "\n".join(rejected)
+            QMessageBox.information(self, "Import rcParams", msg)
+
     def getTableData(self):
         data_dict = {}
         for row in range(self.table.rowCount()):
@@ -858,44 +1038,36 @@ class TableWidget(QWidget):
     def validateRow(self, row) -> bool:
         key = self.table.item(row, 0).text()
         value = self.table.item(row, 1).text()
-        statusItem = self.table.item(row, 2)
-
-        is_valid = False
         try:
-            # get original value
-            original_value = mpl.rcParams[key]
-            # try to set the value to see if it's valid
-            mpl.rcParams[key] = value
-            # reset the value to the original value
-            mpl.rcParams[key] = original_value
+            validate_rc_value(key, value)
         except (ValueError, KeyError, TypeError):
-            icon = self.create_indicator_icon("Invalid Value")
-            statusItem.setIcon(icon)
-            statusItem.setData(Qt.UserRole, "Invalid Value")
-            statusItem.setToolTip("Invalid key/value pair, will be ignored")
-            is_valid = False
+            status = "Invalid Value"
         else:
             if key in self.handled_elsewhere:
-                icon = self.create_indicator_icon("Handled Elsewhere")
-                statusItem.setIcon(icon)
-                statusItem.setData(Qt.UserRole, "Handled Elsewhere")
-                statusItem.setToolTip(
-                    "This key is set elsewhere in GLSE and will be ignored"
-                )
-                is_valid = False
+                status = "Handled Elsewhere"
             else:
-                icon = self.create_indicator_icon("Valid")
-                statusItem.setIcon(icon)
-                statusItem.setData(Qt.UserRole, "Valid")
-                statusItem.setToolTip("Valid key/value pair")
-                is_valid = True
-        return is_valid
+                status = "Valid"
+        self.setRowStatus(row, status)
+        return status == "Valid"
+
+    def setRowStatus(self, row, status):
+        tooltips = {
+            "Valid": "Valid key/value pair",
+            "Invalid Value": "Invalid key/value pair, will be ignored",
+            "Handled Elsewhere": "This key is set elsewhere in GLSE and will be ignored",
+        }
+        statusItem = self.table.item(row, 2)
+        statusItem.setIcon(self.create_indicator_icon(status))
+        statusItem.setData(Qt.UserRole, status)
+        statusItem.setToolTip(tooltips[status])
 
     def validateTable(self):
         for row in range(self.table.rowCount()):
             self.validateRow(row)
 
     def create_indicator_icon(self, status):
+        if status in self.status_icons:
+            return self.status_icons[status]
         pixmap = QPixmap(20, 20)
         pixmap.fill(Qt.transparent)
 
@@ -916,7 +1088,8 @@ class TableWidget(QWidget):
             color = QColor(Qt.transparent)  # No icon
         painter.end()
 
-        return QIcon(pixmap)
+        self.status_icons[status] = QIcon(pixmap)
+        return self.status_icons[status]
 
 
 class ColorCycleWidget(QWidget):
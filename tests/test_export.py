@@ -0,0 +1,59 @@
+import os
+
+import graphinglib as gl
+import pytest
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from glse.export import ExportQueue
+
+CURVE_SCRIPT = os.path.join(
+    os.path.dirname(__file__), os.pardir, "glse", "figures", "curve.py"
+)
+
+
+@pytest.fixture
+def queue():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    queue = ExportQueue(max_workers=2)
+    yield queue
+    queue.shutdown()
+    app.processEvents()
+
+
+def wait_for(queue, job, timeout=60):
+    loop = QEventLoop()
+    queue.jobFinished.connect(lambda finished: finished is job and loop.quit())
+    QTimer.singleShot(timeout * 1000, loop.quit)
+    if not job.done:
+        loop.exec()
+    assert job.done
+
+
+def test_export_uses_params_of_submission(queue, tmp_path):
+    params = gl.file_manager.FileLoader("plain").load()
+    params["rc_params"]["axes.facecolor"] = "#123456"
+    # More files than workers, the last ones wait in the queue
+    paths = [str(tmp_path / f"curve{index}.svg") for index in range(3)]
+    outputs = [(path, "svg", 100) for path in paths]
+    job = queue.submit(CURVE_SCRIPT, params, None, 4, 3, outputs)
+    params["rc_params"]["axes.facecolor"] = "#654321"
+    wait_for(queue, job)
+    assert sorted(job.written) == paths
+    for path in paths:
+        with open(path) as file:
+            assert "#123456" in file.read()
+
+
+def test_crashing_export_does_not_break_the_queue(queue, tmp_path):
+    crashing = tmp_path / "crash.py"
+    crashing.write_text("import os\nos._exit(3)\n")
+    params = gl.file_manager.FileLoader("plain").load()
+    job = queue.submit(
+        str(crashing), params, None, 4, 3, [(str(tmp_path / "a.png"), "png", 50)]
+    )
+    wait_for(queue, job)
+    assert job.errors and not job.written
+    path = str(tmp_path / "curve.png")
+    job = queue.submit(CURVE_SCRIPT, params, None, 4, 3, [(path, "png", 50)])
+    wait_for(queue, job)
+    assert job.written == [path]
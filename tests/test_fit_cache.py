@@ -0,0 +1,61 @@
+import gc
+import weakref
+
+import graphinglib as gl
+import numpy as np
+
+from glse import fit_cache
+from glse.patches import script_patches
+
+
+def scatter():
+    x = np.linspace(-3, 3, 100)
+    y = 3 * x**2 + 2 * x + 1 + np.random.default_rng(0).normal(0, 1, 100)
+    return gl.Scatter(x, y)
+
+
+def test_polynomial_fit_is_restored_from_cache():
+    fit_cache.fits.clear()
+    expected = gl.FitFromPolynomial(scatter(), degree=2, label="Fit")
+    with script_patches():
+        gl.FitFromPolynomial(scatter(), degree=2, label="Fit")
+        fit = gl.FitFromPolynomial(scatter(), degree=2, label="Fit")
+        gl.FitFromPolynomial(scatter(), degree=3, label="Fit")
+    assert len(fit_cache.fits) == 2
+    assert np.array_equal(fit._coeffs, expected._coeffs)
+    assert np.array_equal(fit._cov_matrix, expected._cov_matrix)
+    assert np.array_equal(fit._y_data, expected._y_data)
+    assert fit._label == expected._label
+
+
+def test_restored_fit_does_not_share_arrays():
+    data = scatter()
+    with script_patches():
+        first = gl.FitFromPolynomial(data, degree=2)
+        first._y_data[:] = 0
+        second = gl.FitFromPolynomial(data, degree=2)
+    assert second.curve_to_be_fit is data
+    assert np.any(second._y_data)
+
+
+def test_residuals_follow_the_fitted_data():
+    data = scatter()
+    with script_patches():
+        fit = gl.FitFromPolynomial(data, degree=2)
+        residuals = fit.get_residuals()
+        assert np.array_equal(fit.get_residuals(), residuals)
+        data._y_data = data._y_data + 1
+        assert np.allclose(fit.get_residuals(), residuals - 1)
+
+
+def test_cache_does_not_keep_fits_alive():
+    fit_cache.fits.clear()
+    with script_patches():
+        fit = gl.FitFromPolynomial(scatter(), degree=2)
+        reference = weakref.ref(fit)
+        del fit
+        gc.collect()
+        assert reference() is None
+        restored = gl.FitFromPolynomial(scatter(), degree=2)
+    x = np.linspace(-3, 3, 10)
+    assert np.allclose(restored.function(x), np.polyval(restored._coeffs[::-1], x))
@@ -0,0 +1,64 @@
+import gc
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+resource = pytest.importorskip("resource")
+
+from matplotlib.figure import Figure  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from glse.glse import MainWindow  # noqa: E402
+
+WARMUP_CYCLES = 200
+CYCLES = 2000
+# Allowed peak RSS growth over the measured cycles, well below what one
+# leaked figure per render adds over thousands of cycles
+MAX_RSS_GROWTH = 40 * 1024**2
+
+
+def peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def live_figures() -> int:
+    gc.collect()
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+@pytest.fixture(scope="module")
+def window():
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    # Every cycle must render, not be served from the frame cache
+    window.canvas.frame_cache.set_max_bytes(0)
+    window.show()
+    app.processEvents()
+    yield window
+    window.unsaved_changes = {}
+    window.close()
+    app.processEvents()
+
+
+def run_cycles(window, count):
+    app = QApplication.instance()
+    for cycle in range(count):
+        window.update_params("Curve", "_line_width", 1 + cycle % 4)
+        app.processEvents()
+
+
+@pytest.mark.slow
+def test_update_params_cycles_keep_memory_flat(window):
+    run_cycles(window, WARMUP_CYCLES)
+    figures = live_figures()
+    rss = peak_rss()
+
+    run_cycles(window, CYCLES)
+
+    assert live_figures() <= figures
+    assert peak_rss() - rss < MAX_RSS_GROWTH
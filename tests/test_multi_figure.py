@@ -0,0 +1,70 @@
+import copy
+
+import graphinglib as gl
+import matplotlib
+import numpy as np
+import pytest
+
+from glse.rendering import ScriptFigures
+
+GRID_SCRIPT = """
+import graphinglib as gl
+import numpy as np
+
+x = np.linspace(0, 10, 200)
+curve = gl.Figure(title="curve")
+curve.add_elements(gl.Curve(x, np.sin(x), label="sin"))
+scatter = gl.Figure(title="scatter")
+scatter.add_elements(gl.Scatter(x[::10], np.cos(x[::10])))
+heatmap = gl.Figure(title="heatmap")
+heatmap.add_elements(gl.Heatmap.from_function(
+    lambda u, v: np.sin(u) * v, (0, 3), (0, 3)
+))
+histogram = gl.Figure(title="histogram")
+histogram.add_elements(gl.Histogram(np.random.default_rng(0).normal(size=500), 20))
+grid = gl.MultiFigure.from_grid([curve, scatter, heatmap, histogram], (2, 2))
+grid.show()
+"""
+WIDTH, HEIGHT, DPI = 900, 700, 100
+
+
+@pytest.fixture(autouse=True)
+def agg_backend():
+    matplotlib.use("Agg")
+
+
+@pytest.fixture
+def grid_script(tmp_path):
+    path = tmp_path / "grid.py"
+    path.write_text(GRID_SCRIPT)
+    return str(path)
+
+
+def pixels(frame):
+    return np.frombuffer(frame.data, np.uint8)[: frame.nbytes].copy()
+
+
+@pytest.mark.parametrize(
+    "section, key, value",
+    [
+        ("Heatmap", "_color_map", "plasma"),
+        ("Heatmap", "_show_color_bar", False),
+        ("Curve", "_line_width", 4),
+        ("Histogram", "_face_color", "red"),
+    ],
+)
+def test_updated_subplot_matches_full_render(grid_script, section, key, value):
+    params = gl.file_manager.FileLoader("plain").load()
+    new_params = copy.deepcopy(params)
+    new_params[section][key] = value
+    with ScriptFigures(grid_script) as script:
+        script.prepare("grid", params)
+        preview = script.multi_figures["grid"]
+        preview.render(WIDTH, HEIGHT, DPI)
+        assert preview.update(new_params)
+        assert len(preview.dirty) == 1
+        updated = pixels(preview.render(WIDTH, HEIGHT, DPI))
+    with ScriptFigures(grid_script) as script:
+        script.prepare("grid", new_params)
+        full = pixels(script.multi_figures["grid"].render(WIDTH, HEIGHT, DPI))
+    assert np.array_equal(updated, full)
@@ -0,0 +1,38 @@
+import graphinglib as gl
+import numpy as np
+
+from glse import binning
+from glse.patches import LRUCache, script_patches
+
+
+def test_lru_cache_drops_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_lru_cache_bounded_by_size():
+    cache = LRUCache(10, size=len)
+    cache.put("a", "x" * 6)
+    cache.put("b", "x" * 6)
+    assert "a" not in cache and "b" in cache
+    cache.put("c", "x" * 11)
+    assert "c" not in cache
+    assert cache.total_size == 6
+
+
+def test_patches_only_active_in_scripts():
+    binning.binnings.clear()
+    data = np.random.default_rng(0).normal(size=1000)
+    outside = gl.Histogram(data, 10)
+    assert len(binning.binnings) == 0
+    with script_patches():
+        inside = gl.Histogram(data, 10)
+    assert len(binning.binnings) == 1
+    assert np.array_equal(outside._bin_heights, inside._bin_heights)
+    gl.Histogram(data, 20)
+    assert len(binning.binnings) == 1
@@ -0,0 +1,38 @@
+import pytest
+import yaml
+
+from glse.rc_import import parse_rc_text, to_editor_value, validate_rc_value
+
+RC_TEXT = """
+lines.solid_capstyle: projecting
+lines.dash_capstyle: round
+lines.dash_joinstyle: bevel
+"""
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        ("lines.solid_capstyle", "projecting"),
+        ("lines.dash_capstyle", "round"),
+        ("lines.dash_joinstyle", "bevel"),
+    ],
+)
+def test_cap_and_join_styles_are_plain_strings(key, expected):
+    rc_params, bad_lines = parse_rc_text(RC_TEXT)
+    assert not bad_lines
+    value = to_editor_value(key, validate_rc_value(key, rc_params[key]))
+    assert type(value) is str
+    assert value == expected
+
+
+def test_imported_style_round_trips_through_safe_load():
+    # GraphingLib saves styles with yaml.dump and loads them with safe_load
+    rc_params, _ = parse_rc_text(RC_TEXT)
+    params = {
+        "rc_params": {
+            key: to_editor_value(key, validate_rc_value(key, value))
+            for key, value in rc_params.items()
+        }
+    }
+    assert yaml.safe_load(yaml.dump(params)) == params
@@ -0,0 +1,43 @@
+import os
+
+import graphinglib as gl
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from glse.rendering import ScriptFigures, render_frame, restyle_figure, use_rc_params
+
+FIGURES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "glse", "figures")
+
+
+@pytest.fixture(autouse=True)
+def agg_backend():
+    matplotlib.use("Agg")
+
+
+def pixels(frame):
+    return np.frombuffer(frame.data, np.uint8).copy()
+
+
+@pytest.mark.parametrize(
+    "name, section", [("heatmap", "Heatmap"), ("contour", "Contour")]
+)
+def test_restyled_colormap_matches_fresh_render(name, section):
+    script_path = os.path.join(FIGURES_DIR, f"{name}.py")
+    old_params = gl.file_manager.FileLoader("plain").load()
+    new_params = gl.file_manager.FileLoader("plain").load()
+    new_params[section]["_color_map"] = "viridis"
+    with ScriptFigures(script_path) as script:
+        mpl_figure = script.prepare("fig", old_params)
+        # Drafts are drawn at another size before the full quality frames
+        render_frame(mpl_figure, 400, 300, 100, draft=True)
+        render_frame(mpl_figure, 400, 300, 100)
+        assert restyle_figure(script.figures["fig"], old_params, new_params)
+        # Like the editor, which resets the rc params before each update
+        plt.rcParams.update(plt.rcParamsDefault)
+        use_rc_params(script.figures["fig"], new_params)
+        restyled = pixels(render_frame(mpl_figure, 400, 300, 100))
+    with ScriptFigures(script_path) as script:
+        fresh = pixels(render_frame(script.prepare("fig", new_params), 400, 300, 100))
+    assert np.array_equal(restyled, fresh)
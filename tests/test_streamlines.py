@@ -0,0 +1,57 @@
+import copy
+import os
+
+import graphinglib as gl
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from glse.rendering import ScriptFigures, render_frame, restyle_figure, use_rc_params
+
+STREAM_SCRIPT = os.path.join(
+    os.path.dirname(__file__), os.pardir, "glse", "figures", "stream.py"
+)
+
+
+@pytest.fixture(autouse=True)
+def agg_backend():
+    matplotlib.use("Agg")
+
+
+def stream_params(**changes):
+    params = gl.file_manager.FileLoader("plain").load()
+    params["Stream"]["_color"] = "#0000ff"
+    params["Stream"].update(changes)
+    return params
+
+
+def pixels(frame):
+    return np.frombuffer(frame.data, np.uint8).copy()
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [{"_line_width": 3}, {"_arrow_size": 2.5}, {"_color": "#ff0000"}],
+)
+def test_restyled_stream_matches_full_render(changes):
+    old_params, new_params = stream_params(), stream_params(**changes)
+    with ScriptFigures(STREAM_SCRIPT) as script:
+        mpl_figure = script.prepare("fig", old_params)
+        render_frame(mpl_figure, 400, 300, 100, draft=True)
+        render_frame(mpl_figure, 400, 300, 100)
+        assert restyle_figure(script.figures["fig"], old_params, new_params)
+        # Like the editor, which resets the rc params before each update
+        plt.rcParams.update(plt.rcParamsDefault)
+        use_rc_params(script.figures["fig"], new_params)
+        restyled = pixels(render_frame(mpl_figure, 400, 300, 100))
+    with ScriptFigures(STREAM_SCRIPT) as script:
+        full = pixels(render_frame(script.prepare("fig", new_params), 400, 300, 100))
+    assert np.array_equal(restyled, full)
+
+
+def test_cycle_color_needs_full_render():
+    old_params, new_params = stream_params(), stream_params(_color=None)
+    with ScriptFigures(STREAM_SCRIPT) as script:
+        script.prepare("fig", old_params)
+        assert not restyle_figure(script.figures["fig"], old_params, new_params)